@@ -0,0 +1,406 @@
+# analysis_engine.py — конвейер анализа без Streamlit
+# новости → перевод → настроение → прогноз → цена/история → сигнал и план сделки (TP/SL, сроки).
+# Импортируется приложениями и запускается из командной строки для пачки монет:
+#   python analysis_engine.py bitcoin ethereum "Shiba Inu=shiba-inu" --workers 8 --out signals.jsonl
+#   python analysis_engine.py --coins-file coins.txt --format parquet --out signals.parquet
+
+import re, sys, json, time, argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import requests
+import http_client, feed_cache, translation, price_store, price_service, coin_index, perf_trace, cache_regions, near_dup, news_corpus
+from news_engine import fetch_all as fetch_news_all
+from sentiment import sentiment_scores, top_drivers
+from model_registry import simple_predict
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (CryptoSentimentBot/1.0)",
+    "Accept": "application/json",
+}
+COINGECKO_URL = "https://api.coingecko.com/api/v3"
+COINGECKO_HOST = "api.coingecko.com"   # ключ очереди http_client
+GOOGLE_NEWS_RSS = "https://news.google.com/rss/search?q={query}"
+COINTELEGRAPH_RSS = "https://cointelegraph.com/rss"
+COINDESK_RSS = "https://www.coindesk.com/arc/outboundfeeds/rss/"
+GENERAL_FEEDS = {"Cointelegraph": COINTELEGRAPH_RSS, "CoinDesk": COINDESK_RSS}
+GENERAL_MAX_AGE = 120   # сек: общие фиды одни на все монеты — их держит свежими prefetch
+
+# ========= Утилиты =========
+def clean_html(t: str) -> str: return re.sub(r"<.*?>", "", t or "").strip()
+def shorten(t: str, n=300) -> str: return (t[:n] + "...") if t and len(t) > n else (t or "")
+
+# -------------------- Новости/тон --------------------
+def _rss_items(url, src, n=10, timeout=6, max_age=0):
+    # без перехвата ошибок — их видит news_engine и пишет в отчёт
+    out=[]
+    for e in feed_cache.get_entries(url, headers=HEADERS, timeout=timeout, max_age=max_age)[:n]:
+        title = clean_html(e.get("title","")); s = clean_html(e.get("summary",""))
+        out.append((f"[{src}]", title, shorten(title+" — "+s, 300)))
+    return out
+
+def fetch_rss(url, src, n=10, timeout=6):
+    try: return _rss_items(url, src, n, timeout)
+    except Exception: return []
+
+def google_news_url(q): return GOOGLE_NEWS_RSS.format(query=requests.utils.quote(q))
+
+def fetch_google_news(q, n=12, timeout=6):
+    return fetch_rss(google_news_url(q), "GoogleNews", n, timeout)
+
+# Общие фиды (Cointelegraph, CoinDesk) не фильтруются заново под каждую монету: снимок фида
+# один раз уходит в news_corpus, а новости монеты берутся из его индекса «монета → заголовки».
+_ingested = {}   # источник -> список записей feed_cache, уже разобранный в корпус
+
+def ingest_general(src, max_age=GENERAL_MAX_AGE, timeout=6):
+    """Снимок общего фида src → news_corpus (если фид не менялся — без разбора). Возвращает число записей."""
+    entries = feed_cache.get_entries(GENERAL_FEEDS[src], headers=HEADERS, timeout=timeout, max_age=max_age)
+    if _ingested.get(src) is not entries:   # feed_cache отдаёт тот же список, пока фид не изменился
+        news_corpus.ingest(src, [(clean_html(e.get("title","")),
+                                  clean_html(e.get("summary","")) or clean_html(e.get("description","")))
+                                 for e in entries])
+        _ingested[src] = entries
+    return len(entries)
+
+def general_news(src, q=None, n=8):
+    """[(src, заголовок, анонс)] общего фида: про монету q (индекс корпуса) или просто свежие."""
+    try:
+        ingest_general(src)
+    except Exception:
+        if not news_corpus.recent(src, 1): raise   # сеть упала, но корпус уже есть — отдаём его
+    return news_corpus.lookup(q, src=src, n=n) if q else news_corpus.recent(src, n)
+
+def _corpus_items(src, q, n):
+    return [(f"[{s}]", t, shorten(t+" — "+sm, 300)) for s, t, sm in general_news(src, q, n)]
+
+def collect_news(q):
+    """Все три фида параллельно под общим дедлайном. Возвращает (новости, отчёт по источникам)."""
+    items, report = fetch_news_all([
+        ("GoogleNews",    lambda: _rss_items(google_news_url(q), "GoogleNews", 15)),
+        *[(src, lambda src=src: _corpus_items(src, q, 8)) for src in GENERAL_FEEDS],
+    ])
+    return dedup_news(items, q, matched=[f"[{src}]" for src in GENERAL_FEEDS]), report
+
+def dedup_news(items, q, limit=80, threshold=None, matched=()):
+    """
+    Только новости с упоминанием q, без коротких и почти-дублей (near_dup по тексту превью:
+    один сюжет из разных фидов — одна новость, первая по порядку источников); не больше limit.
+    matched — источники, чьи новости уже отобраны по монете (индекс news_corpus), без проверки q.
+    """
+    ql = q.lower(); filtered = []; idx = near_dup.NearDupIndex(threshold); seen = set()
+    for s,t,sh in items:
+        combined = (t+" "+sh).lower()
+        if (s in matched or ql in combined) and len(sh)>30 and sh.lower() not in seen and idx.add(sh) == len(idx)-1:
+            filtered.append((s,t,sh)); seen.add(sh.lower())   # точный повтор ловится и без шинглов (превью без букв)
+        if len(filtered)>=limit: break
+    return filtered
+
+def refresh_general_feeds():
+    """Для prefetch: перепроверить общие фиды (условный запрос) и разобрать в корпус → {источник: записей}."""
+    return {src: ingest_general(src, max_age=0) for src in GENERAL_FEEDS}
+
+def translate_items(items, translator=None):
+    translator = translator or translation.get_translator()
+    if translator is None: return items
+    trs = translation.translate_many([f"{t}. {sh}" for s,t,sh in items], translator)
+    out=[]
+    for (s,t,sh), tr in zip(items, trs):
+        if not tr:
+            out.append((s,t,sh))
+        elif "." in tr:
+            a,b = tr.split(".",1); out.append((s, a.strip(), shorten(b.strip(), 300)))
+        else:
+            out.append((s, tr.strip(), tr.strip()))
+    return out
+
+# -------------------- Цена / сигнал --------------------
+def fetch_price(cid, also=()):
+    return price_service.get_price(cid, also=also, base_url=COINGECKO_URL)
+
+def trading_signal(p, d, c, lev=None):
+    lv = max(1, min(5, int(abs(c)*10))) if lev is None else max(1, min(10, int(lev)))
+    if d=="up" and c>0.05:
+        t=p*(1+c*lv); s=p*(1-0.02*lv); return f"LONG x{lv} | TP: ${t:.2f} | SL: ${s:.2f}", "var(--ok)", lv
+    if d=="down" and c<-0.05:
+        t=p*(1+c*lv); s=p*(1+0.02*lv); return f"SHORT x{lv} | TP: ${t:.2f} | SL: ${s:.2f}", "var(--bad)", lv
+    return "HOLD", "var(--warn)", 1
+
+# ответы /search меняются редко: час свежие, ещё сутки отдаются сразу с обновлением в фоне
+@cache_regions.cached("search", ttl=3600, stale=86400)
+def _cg_search(query):
+    r = http_client.get(f"{COINGECKO_URL}/search", params={"query": query}, endpoint="coingecko"); r.raise_for_status()
+    data = r.json().get("coins", []);  ql=query.lower().strip()
+    if not data: return None
+    exact = [c for c in data if c.get("id")==ql or c.get("name","").lower()==ql or c.get("symbol","").lower()==ql]
+    pick = exact[0] if exact else data[0];  return pick.get("id")
+
+def cg_search_id(query: str):
+    # сначала локальный индекс монет (coin_index); /search — только если индекс не готов или не нашёл
+    cid = coin_index.resolve(query)
+    if cid: return cid
+    try: return _cg_search(query)
+    except Exception: return None
+
+def resolve_coin_input(inp: str):
+    s = (inp or "").strip()
+    if not s: return ("id","bitcoin")
+    if s.startswith("0x") and len(s)>20: return ("contract",("ethereum",s))
+    if len(s)>=32 and not s.startswith("0x") and s.isalnum(): return ("contract",("solana",s))
+    return ("id", s)
+
+def fetch_market_series(user_input: str, days=7, interval="hourly"):
+    kind, val = resolve_coin_input(user_input)
+    if kind=="contract":
+        maybe_id = cg_search_id(val[1]);  user_input = maybe_id or user_input
+        if maybe_id is None: return pd.DataFrame(columns=["date","price"])
+    coin_id=str(user_input).strip().lower()
+    if " " in coin_id or any(c.isupper() for c in str(user_input)) or len(coin_id)<=4:
+        maybe=cg_search_id(user_input);  coin_id=maybe or coin_id
+    # локальная история (price_store): с сети — только свечи после последней сохранённой
+    return price_store.series(coin_id, days=days, interval=interval, base_url=COINGECKO_URL)
+
+def estimate_atr_pct_from_series(df: pd.DataFrame):
+    if df.empty or len(df)<5: return 0.6
+    p=df["price"].values; diffs=np.diff(p)
+    return float(np.median(np.abs(diffs/p[:-1])*100))
+
+def build_trade_plan(price, side, atr, strength):
+    abs_ch=abs(strength)
+    risk=1 if abs_ch<0.2 else 2 if abs_ch<0.5 else 3 if abs_ch<0.9 else 4 if abs_ch<1.3 else 5
+    m=1.2+0.3*(risk-1)+0.2*abs_ch
+    tp1p,tp2p,tp3p=atr*(2*m), atr*(3.5*m), atr*(5*m)
+    slp=max(atr*(1.5*m),0.5)
+    sgn=1 if side=="LONG" else -1
+    tp1,tp2,tp3=[price*(1+sgn*p/100) for p in (tp1p,tp2p,tp3p)]
+    sl=price*(1 - sgn*slp/100)
+    vol=max(0.2,atr); h1,h2,h3=(tp1p/vol*1.2, tp2p/vol*1.3, tp3p/vol*1.4)
+    def hor(h): return "скальпинг" if h<=2 else "интрадей" if h<=8 else "свинг" if h<=36 else "позиционно"
+    horizons={"TP1":f"{hor(h1)} ~{h1:.1f}ч","TP2":f"{hor(h2)} ~{h2:.1f}ч","TP3":f"{hor(h3)} ~{h3:.1f}ч"}
+    levels=[{"L":"TP1","P":tp1,"M":tp1p},{"L":"TP2","P":tp2,"M":tp2p},{"L":"TP3","P":tp3,"M":tp3p},{"L":"SL","P":sl,"M":slp}]
+    return levels,horizons,atr
+
+# -------------------- Пакетные версии (numpy) --------------------
+# Те же формулы над массивами — для скрининга списка монет / сетки параметров за один проход.
+# Порядок операций повторяет скалярные функции: числа совпадают бит в бит (сверка — bench_hotpaths),
+# пороги и NaN в плане — тоже. Нецелое плечо там, где скаляр падает на int(), падает и здесь.
+SIDES = ("HOLD", "LONG", "SHORT")                             # код стороны в trading_signal_batch
+HORIZONS = ("скальпинг", "интрадей", "свинг", "позиционно")   # код корзины горизонта в build_trade_plan_batch
+_RISK_EDGES = np.array([0.2, 0.5, 0.9, 1.3])
+_HORIZON_EDGES = np.array([2.0, 8.0, 36.0])
+
+def _f64(x, n=None):
+    a = np.asarray(x, dtype=np.float64)
+    return np.broadcast_to(a, (n,)) if n is not None and a.ndim == 0 else a
+
+def _check_int(x):
+    bad = ~np.isfinite(x)
+    if bad.any():
+        i = int(np.argmax(bad))
+        raise (ValueError if np.isnan(x[i]) else OverflowError)(f"строка {i}: плечо из {x[i]} не переводится в int")
+
+def trading_signal_batch(prices, directions, changes, levs=None):
+    """
+    trading_signal для массивов. levs — None, число или массив (NaN в levs — как lev=None: плечо по силе прогноза).
+    → dict массивов: side (код в SIDES), lv, tp, sl (у HOLD — NaN, lv = 1).
+    NaN / inf в changes при авто-плече и inf в levs — ValueError / OverflowError, как у trading_signal.
+    """
+    c = _f64(changes); n = len(c); p = _f64(prices, n)
+    d = np.broadcast_to(np.asarray(directions), (n,))
+    lv_in = np.full(n, np.nan) if levs is None else _f64(levs, n)
+    use_auto = np.isnan(lv_in)
+    # как int() в скалярной версии: NaN / ±inf там, где считается плечо, — ошибка, а не тихий HOLD
+    _check_int(np.where(use_auto, np.abs(c)*10, lv_in))
+    auto = np.clip(np.trunc(np.abs(c)*10), 1, 5)
+    lv = np.where(use_auto, auto, np.clip(np.trunc(np.nan_to_num(lv_in)), 1, 10))
+    long_, short_ = (d == "up") & (c > 0.05), (d == "down") & (c < -0.05)
+    side = np.where(long_, 1, np.where(short_, 2, 0)).astype(np.int8)
+    lv = np.where(side > 0, lv, 1).astype(np.int64)
+    act = side > 0
+    tp = np.where(act, p*(1 + c*lv), np.nan)
+    sl = np.where(long_, p*(1 - 0.02*lv), np.where(short_, p*(1 + 0.02*lv), np.nan))
+    return {"side": side, "lv": lv, "tp": tp, "sl": sl}
+
+def build_trade_plan_batch(prices, sides, atrs, strengths):
+    """
+    build_trade_plan для массивов; sides — "LONG"/"SHORT" (всё, что не "LONG", — шорт).
+    → dict массивов: tp1, tp2, tp3, sl — цены; tp1p, tp2p, tp3p, slp — отступы, %;
+    h1, h2, h3 — часы до целей; hor1, hor2, hor3 — коды корзин в HORIZONS.
+    """
+    s = _f64(strengths); n = len(s)
+    price, atr = _f64(prices, n), _f64(atrs, n)
+    abs_ch = np.abs(s)
+    risk = np.searchsorted(_RISK_EDGES, abs_ch, side="right") + 1
+    m = 1.2 + 0.3*(risk - 1) + 0.2*abs_ch
+    tp1p, tp2p, tp3p = atr*(2*m), atr*(3.5*m), atr*(5*m)
+    slp = atr*(1.5*m); slp = np.where(0.5 > slp, 0.5, slp)         # как max(x, 0.5), включая NaN
+    sgn = np.where(np.broadcast_to(np.asarray(sides), (n,)) == "LONG", 1, -1)
+    out = {f"tp{k}": price*(1 + sgn*pk/100) for k, pk in ((1, tp1p), (2, tp2p), (3, tp3p))}
+    out["sl"] = price*(1 - sgn*slp/100)
+    vol = np.where(atr > 0.2, atr, 0.2)                                # как max(0.2, atr)
+    hs = (tp1p/vol*1.2, tp2p/vol*1.3, tp3p/vol*1.4)
+    out.update(tp1p=tp1p, tp2p=tp2p, tp3p=tp3p, slp=slp)
+    for k, h in enumerate(hs, 1):
+        out[f"h{k}"] = h; out[f"hor{k}"] = np.searchsorted(_HORIZON_EDGES, h, side="left").astype(np.int8)
+    return out
+
+def trade_plan_row(batch, i):
+    """i-я строка build_trade_plan_batch в виде (levels, horizons) скалярной build_trade_plan."""
+    g = lambda k: float(batch[k][i])
+    horizons = {f"TP{k}": f"{HORIZONS[batch[f'hor{k}'][i]]} ~{g(f'h{k}'):.1f}ч" for k in (1, 2, 3)}
+    levels = [{"L": f"TP{k}", "P": g(f"tp{k}"), "M": g(f"tp{k}p")} for k in (1, 2, 3)]
+    levels.append({"L": "SL", "P": g("sl"), "M": g("slp")})
+    return levels, horizons
+
+# ========= Стадии анализа =========
+# Новости → тон, цена и история цены друг от друга не зависят: идут параллельно, а run_stages
+# отдаёт их по готовности — UI рисует каждую часть сразу, CLI ждёт самую долгую, а не сумму.
+# Пул — свой на вызов (поток на стадию): параллельность analyze_many задаёт только workers.
+
+def _stage(name, fn):
+    with perf_trace.span(name) as sp:
+        try:
+            return name, fn(), None
+        except Exception as e:
+            sp["error"] = f"{type(e).__name__}: {e}"
+            return name, None, e
+
+def run_stages(stages):
+    """{имя: функция без аргументов} → генератор (имя, результат, ошибка | None) в порядке готовности."""
+    pool = ThreadPoolExecutor(max_workers=max(1, len(stages)), thread_name_prefix="stage")
+    try:
+        futs = [pool.submit(perf_trace.bind(_stage), name, fn) for name, fn in stages.items()]
+        for f in as_completed(futs):
+            yield f.result()
+    finally:
+        pool.shutdown(wait=False)   # брошенный генератор (ошибка UI) не ждёт оставшиеся стадии
+
+def news_sentiment(coin_name, translate=True, collect=collect_news, translate_fn=translate_items, text=lambda x: x[2]):
+    """
+    Новости → перевод → тон → прогноз одной стадией. collect / translate_fn / text — для своей
+    сборки новостей (мягкая сборка Deck). → dict: news, report, sent, items, direction, change.
+    """
+    with perf_trace.span("news") as sp:
+        news, report = collect(coin_name); sp["items"] = len(news)
+    with perf_trace.span("translate", items=len(news)):
+        news_tr = translate_fn(news) if translate else news
+    with perf_trace.span("sentiment", items=len(news_tr)):
+        sent, sent_items = sentiment_scores([text(x) for x in news_tr])
+    direction, change = simple_predict(sent)
+    return {"news": news_tr, "report": report, "sent": sent, "items": sent_items,
+            "direction": direction, "change": change}
+
+def series_if_priced(cid, price_fn, series_fn, days=7, interval="hourly"):
+    # история — только для монеты с ценой: на неверный id не тратим цепочку запросов market_chart.
+    # price_fn — тот же вызов, что у стадии цены: кэш цен склеивает их в один запрос
+    if price_fn(cid.lower()) is None: return pd.DataFrame(columns=["date","price"])
+    return series_fn(cid, days=days, interval=interval)
+
+# ========= Полный анализ одной монеты =========
+def analyze(coin_name, cid=None, lev=None, translate=True):
+    """
+    Весь конвейер Analysis Deck для одной монеты → dict, пригодный для JSON.
+    coin_name — запрос для новостей, cid — id CoinGecko (по умолчанию = coin_name).
+    """
+    t0 = time.perf_counter()
+    tr = perf_trace.begin(f"analyze:{coin_name}")
+    cid = str(cid or coin_name).strip()
+    got = {name: (val, err) for name, val, err in run_stages({
+        "news_sentiment": lambda: news_sentiment(coin_name, translate),
+        "price": lambda: fetch_price(cid.lower()),
+        "market_series": lambda: series_if_priced(cid, fetch_price, fetch_market_series),
+    })}
+    # ограничение частоты по цене / истории — не падение монеты, а пометка в результате
+    for name, (val, err) in got.items():
+        if err is not None and not (name != "news_sentiment" and isinstance(err, http_client.Throttled)): raise err
+    ns, price, series = got["news_sentiment"][0], got["price"][0], got["market_series"][0]
+    series_err = got["market_series"][1]
+    news_tr, sent, sent_items = ns["news"], ns["sent"], ns["items"]
+    direction, change, news_report = ns["direction"], ns["change"], ns["report"]
+    pos, neg = top_drivers([x[1] for x in news_tr], sent_items)
+    res = {
+        "coin": coin_name, "id": cid, "ts": int(time.time()),
+        "news": len(news_tr), "sentiment": sent, "direction": direction, "change": change,
+        "price": price, "drivers": {"pos": pos, "neg": neg}, "news_sources": news_report,
+    }
+    if price is None:
+        res["error"] = "throttled" if got["price"][1] is not None or http_client.throttled(COINGECKO_HOST) else "no price"
+    elif series_err is not None:
+        # без истории ATR был бы заглушкой 0.6 — план не строим, только сигнал
+        sigtxt, _, lv = trading_signal(price, direction, change, lev)
+        res.update(signal=sigtxt, leverage=lv, series_error="throttled", series_points=0)
+    else:
+        sigtxt, _, lv = trading_signal(price, direction, change, lev)
+        atr_pct = estimate_atr_pct_from_series(series)
+        side = "LONG" if direction=="up" else "SHORT" if direction=="down" else "LONG"
+        levels, horizons, atr = build_trade_plan(price, side, atr_pct, change)
+        res.update(signal=sigtxt, leverage=lv, side=side, atr_pct=atr, series_points=len(series),
+                   levels=levels, horizons=horizons)
+    res["elapsed_s"] = round(time.perf_counter() - t0, 3)
+    # мс по стадиям верхнего уровня; полная трасса — в CRYPTO_BOT_TRACE_FILE, если задан
+    res["timings_ms"] = {s["span"]: s["ms"] for s in perf_trace.finish(tr)["spans"] if s["parent"] is None}
+    return res
+
+def analyze_many(coins, workers=8, lev=None, translate=True):
+    """
+    coins — список (имя, id). Монеты анализируются параллельно; результаты — в порядке списка
+    (генератор), ошибка одной монеты не останавливает остальные.
+    """
+    # цены всех монет — одной пачкой заранее, дальше analyze берёт их из кэша price_service
+    price_service.get_prices([cid for _, cid in coins], base_url=COINGECKO_URL)
+    coin_index.ensure_loaded(COINGECKO_URL)
+
+    def one(nc):
+        name, cid = nc
+        # пакет — фоновый приоритет: ждёт в очереди к CoinGecko до MAX_WAIT[BACKGROUND], а не 15 с,
+        # и пропускает вперёд интерактивные запросы этого процесса
+        try:
+            with http_client.background(): return analyze(name, cid, lev=lev, translate=translate)
+        except Exception as e: return {"coin": name, "id": cid, "ts": int(time.time()), "error": f"{type(e).__name__}: {e}"}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="analyze") as ex:
+        yield from ex.map(one, coins)
+
+# ========= CLI =========
+def _parse_coin(arg):
+    # "bitcoin" или "Shiba Inu=shiba-inu" (имя для новостей = id CoinGecko)
+    name, _, cid = arg.partition("=")
+    return name.strip(), (cid or name).strip()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Пакетный анализ монет: новости → настроение → сигнал и план сделки.")
+    ap.add_argument("coins", nargs="*", help='id CoinGecko или "Имя=id"')
+    ap.add_argument("--coins-file", help="файл со списком монет, по одной на строку")
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--lev", type=int, default=None, help="фиксированное плечо (по умолчанию авто)")
+    ap.add_argument("--no-translate", action="store_true", help="не переводить новости (быстрее)")
+    ap.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    ap.add_argument("--out", default="-", help="файл результата (jsonl: «-» = stdout)")
+    a = ap.parse_args(argv)
+
+    args = list(a.coins)
+    if a.coins_file:
+        with open(a.coins_file, encoding="utf-8") as f:
+            args += [l.strip() for l in f if l.strip() and not l.startswith("#")]
+    if not args: ap.error("нужна хотя бы одна монета")
+    coins = list(dict.fromkeys(_parse_coin(x) for x in args))
+
+    results = analyze_many(coins, workers=a.workers, lev=a.lev, translate=not a.no_translate)
+    if a.format == "parquet":
+        if a.out == "-": ap.error("для parquet нужен --out")
+        rows = [{**r, **{k: json.dumps(r[k], ensure_ascii=False) for k in ("levels","horizons","drivers","news_sources","timings_ms") if k in r}}
+                for r in results]
+        pd.DataFrame(rows).to_parquet(a.out, index=False)
+        print(f"{len(rows)} монет → {a.out}", file=sys.stderr)
+        return
+    out = sys.stdout if a.out == "-" else open(a.out, "w", encoding="utf-8")
+    try:
+        n = errors = degraded = 0
+        for r in results:
+            out.write(json.dumps(r, ensure_ascii=False) + "\n"); out.flush(); n += 1
+            errors += "error" in r; degraded += "series_error" in r
+    finally:
+        if out is not sys.stdout: out.close()
+    print(f"{n} монет → {a.out} · ошибок {errors} · без плана (история: throttled) {degraded}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
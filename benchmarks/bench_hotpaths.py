@@ -0,0 +1,193 @@
+# bench_hotpaths.py — микробенчмарки чистых функций на синтетике растущего размера (без сети)
+# Результат — мкс на элемент по каждому (функция, размер); сравнивается с сохранённым baseline.json.
+#   python benchmarks/bench_hotpaths.py                          — таблица
+#   python benchmarks/bench_hotpaths.py --json --out res.jsonl   — JSON-строки
+#   python benchmarks/bench_hotpaths.py --check                  — код выхода 1 при регрессии
+#   python benchmarks/bench_hotpaths.py --update-baseline        — переписать baseline
+
+import os, sys, json, time, random, argparse, platform
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+import sentiment
+from pump_engine import pump_norm, meme_score, meme_signal, add_signals
+from analysis_engine import (clean_html, dedup_news, trading_signal, build_trade_plan,
+                             estimate_atr_pct_from_series, trading_signal_batch, build_trade_plan_batch,
+                             SIDES, trade_plan_row)
+from bench_pump import synthetic_items
+
+BASELINE = os.path.join(HERE, "baseline.json")
+SIZES = (100, 1000, 10000)
+TOLERANCE = 0.5      # допуск: медленнее baseline больше чем на 50% — регрессия
+MIN_TOTAL_MS = 1.0   # совсем короткие замеры шумят — их не судим
+BASELINE_PASSES = 3  # baseline — лучшее из нескольких полных прогонов
+CONFIRM = 2          # повторных замеров подозрительного результата: регрессия — только если не ушла
+
+_WORDS = ("bitcoin ethereum surge crash rally dump whale record fear great bad ETF approval hack "
+          "listing lawsuit pump bullish bearish market inflows outflows").split()
+
+def _headline(r, i):
+    return f"{' '.join(r.choice(_WORDS) for _ in range(8))} #{i}"
+
+def _news(n, seed=0):
+    # треть — повторы: как в реальном потоке, где одну новость дают несколько фидов
+    r = random.Random(seed); out = []
+    for i in range(n):
+        t = _headline(r, i if r.random() > 0.33 else r.randrange(max(1, i)))
+        out.append(("[Src]", t, f"{t} — {_headline(r, i)} bitcoin"))
+    return out
+
+def _pump_rows(n):
+    return [pump_norm(x) for x in synthetic_items(n)]
+
+# имя -> (подготовка(n) → данные, замер(данные))
+CASES = {
+    "pump_norm": (lambda n: synthetic_items(n), lambda xs: [pump_norm(x) for x in xs]),
+    "meme_score": (_pump_rows, lambda rs: [meme_score(r) for r in rs]),
+    "meme_signal": (_pump_rows, lambda rs: [meme_signal(r) for r in rs]),
+    "add_signals": (lambda n: pd.DataFrame(_pump_rows(n)), add_signals),
+    "estimate_atr_pct_from_series": (
+        lambda n: pd.DataFrame({"price": 100*np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, n)))}),
+        estimate_atr_pct_from_series),
+    "build_trade_plan": (
+        lambda n: [(100.0*(1+i%7), "LONG" if i%2 else "SHORT", 0.2+i%30/10, (i%40-20)/10) for i in range(n)],
+        lambda xs: [build_trade_plan(*x) for x in xs]),
+    "trading_signal": (
+        lambda n: [(100.0*(1+i%7), ("up","down","flat")[i%3], (i%40-20)/10, None if i%2 else i%10+1) for i in range(n)],
+        lambda xs: [trading_signal(*x) for x in xs]),
+    # пакетные версии на тех же данных, уже разложенных по колонкам
+    "build_trade_plan_batch": (
+        lambda n: [np.array(c) for c in zip(*CASES["build_trade_plan"][0](n))],
+        lambda cols: build_trade_plan_batch(*cols)),
+    "trading_signal_batch": (
+        lambda n: [np.array([np.nan if v is None else v for v in c]) if k == 3 else np.array(c)
+                   for k, c in enumerate(zip(*CASES["trading_signal"][0](n)))],
+        lambda cols: trading_signal_batch(*cols)),
+    # без кэша оценок: меряем сам VADER, а не попадание в словарь
+    "sentiment_score": (
+        lambda n: [t for _, t, _ in _news(n, seed=1)],
+        lambda ts: (sentiment._cache.clear(), sentiment.sentiment_score(ts))),
+    "clean_html": (
+        lambda n: [f"<p><b>{_headline(random.Random(i), i)}</b> <a href='x'>link</a></p>" for i in range(n)],
+        lambda xs: [clean_html(x) for x in xs]),
+    "dedup_news": (lambda n: _news(n), lambda xs: dedup_news(xs, "bitcoin", limit=len(xs))),
+}
+
+# пакетные версии обязаны совпадать со скалярными: сверка на тех же данных перед замером
+def _same(x, y):
+    return x == y or (x != x and y != y)   # NaN == NaN
+
+def check_plan_batch(n):
+    rows = CASES["build_trade_plan"][0](n)
+    b = build_trade_plan_batch(*[np.array(c) for c in zip(*rows)])
+    for i, r in enumerate(rows):
+        levels, horizons, _ = build_trade_plan(*r); bl, bh = trade_plan_row(b, i)
+        assert horizons == bh, f"build_trade_plan_batch[{i}]: {bh} != {horizons}"
+        assert all(a["L"] == c["L"] and _same(a["P"], c["P"]) and _same(a["M"], c["M"]) for a, c in zip(levels, bl)), \
+            f"build_trade_plan_batch[{i}]: {bl} != {levels}"
+
+def check_signal_batch(n):
+    rows = CASES["trading_signal"][0](n)
+    b = trading_signal_batch(*CASES["trading_signal_batch"][0](n))
+    for i, r in enumerate(rows):
+        txt, _, lv = trading_signal(*r); side = SIDES[b["side"][i]]
+        exp = "HOLD" if side == "HOLD" else f"{side} x{b['lv'][i]} | TP: ${b['tp'][i]:.2f} | SL: ${b['sl'][i]:.2f}"
+        assert (txt, lv) == (exp, b["lv"][i]), f"trading_signal_batch[{i}]: {exp} != {txt}"
+        if side != "HOLD":   # сами числа, не только их запись с двумя знаками
+            p, _, c, _ = r; t = p*(1+c*lv); s = p*(1-0.02*lv) if side == "LONG" else p*(1+0.02*lv)
+            assert (t, s) == (b["tp"][i], b["sl"][i]), f"trading_signal_batch[{i}]: {(b['tp'][i], b['sl'][i])} != {(t, s)}"
+
+CHECKS = {"build_trade_plan_batch": check_plan_batch, "trading_signal_batch": check_signal_batch}
+
+def best_of(fn, arg, repeat):
+    ts = []
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(arg); ts.append(time.perf_counter() - t0)
+    return min(ts)
+
+def calibrate(repeat=7):
+    """Эталонная нагрузка (чистый Python, dict/float) — мс; делит на неё, чтобы сравнивать разные машины/прогоны."""
+    def work(_):
+        d = {}
+        for i in range(50000): d[i & 1023] = d.get(i & 1023, 0.0) + i*0.5
+    return round(best_of(work, None, repeat)*1000, 3)
+
+def run(names, sizes, repeat):
+    sentiment.analyzer()  # лексикон VADER грузится один раз — не в замер
+    for name in names:
+        prep, fn = CASES[name]
+        for n in sizes:
+            if name in CHECKS: CHECKS[name](n)
+            data = prep(n); fn(data)  # прогрев
+            t = best_of(fn, data, repeat)
+            yield {"case": name, "size": n, "total_ms": round(t*1000, 3), "us_per_item": round(t*1e6/n, 3)}
+
+def compare(res, base, tolerance, scale=1.0):
+    """Добавляет к результату ratio к baseline (с поправкой на скорость машины scale) и флаг regression."""
+    b = (base.get("results") or {}).get(res["case"], {}).get(str(res["size"]))
+    res["baseline_us"] = b
+    res["ratio"] = round(res["us_per_item"]/b/scale, 2) if b else None
+    res["regression"] = bool(b and res["total_ms"] >= MIN_TOTAL_MS and res["ratio"] > 1 + tolerance)
+    return res
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Микробенчмарки горячих путей (без сети).")
+    ap.add_argument("--cases", default=",".join(CASES), help="через запятую")
+    ap.add_argument("--sizes", default=",".join(map(str, SIZES)))
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE)
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--check", action="store_true", help="код выхода 1, если есть регрессия")
+    ap.add_argument("--update-baseline", action="store_true")
+    ap.add_argument("--json", action="store_true", help="JSON-строка на замер вместо таблицы")
+    ap.add_argument("--out", help="дописать результаты JSON-строками в файл")
+    a = ap.parse_args(argv)
+
+    names = [c.strip() for c in a.cases.split(",") if c.strip()]
+    unknown = [c for c in names if c not in CASES]
+    if unknown: ap.error(f"нет таких замеров: {', '.join(unknown)}")
+    base = {}
+    if os.path.exists(a.baseline) and not a.update_baseline:
+        with open(a.baseline, encoding="utf-8") as f: base = json.load(f)
+
+    cal = calibrate()
+    scale = cal/base["calibration_ms"] if base.get("calibration_ms") else 1.0
+    if not a.json: print(f"калибровка: {cal:.2f} мс (к baseline ×{scale:.2f})")
+    results = []
+    for res in run(names, [int(x) for x in a.sizes.split(",")], a.repeat):
+        compare(res, base, a.tolerance, scale)
+        for _ in range(CONFIRM if res["regression"] else 0):
+            # шум соседей по машине бывает ×1.5–2 — перемеряем вместе с калибровкой и берём лучшее
+            s2 = calibrate()/base["calibration_ms"] if base.get("calibration_ms") else 1.0
+            again = compare(next(run([res["case"]], [res["size"]], a.repeat)), base, a.tolerance, s2)
+            if again["ratio"] < res["ratio"]: res = again
+            if not res["regression"]: break
+        results.append(res)
+        if a.json: print(json.dumps(res), flush=True)
+        else:
+            r = f"×{res['ratio']}" if res["ratio"] else "—"
+            print(f"{res['case']:<30} {res['size']:>6} | {res['us_per_item']:>10.3f} мкс/эл | {res['total_ms']:>9.2f} мс | к baseline {r}"
+                  + ("  РЕГРЕССИЯ" if res["regression"] else ""), flush=True)
+    if a.out:
+        with open(a.out, "a", encoding="utf-8") as f:
+            for res in results: f.write(json.dumps(res) + "\n")
+
+    if a.update_baseline:
+        best = {(r["case"], r["size"]): r["us_per_item"] for r in results}
+        for _ in range(BASELINE_PASSES - 1):
+            cal = min(cal, calibrate())
+            for r in run(names, [int(x) for x in a.sizes.split(",")], a.repeat):
+                best[r["case"], r["size"]] = min(best[r["case"], r["size"]], r["us_per_item"])
+        out = {"python": platform.python_version(), "machine": platform.machine(), "numpy": np.__version__,
+               "pandas": pd.__version__, "repeat": a.repeat, "calibration_ms": cal, "results": {}}
+        for (case, n), us in best.items(): out["results"].setdefault(case, {})[str(n)] = us
+        with open(a.baseline, "w", encoding="utf-8") as f: json.dump(out, f, indent=1, ensure_ascii=False)
+        print(f"baseline → {a.baseline}", file=sys.stderr)
+    bad = [f"{r['case']}@{r['size']}" for r in results if r["regression"]]
+    if bad: print("регрессии: " + ", ".join(bad), file=sys.stderr)
+    if a.check and bad: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
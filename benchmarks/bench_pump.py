@@ -0,0 +1,71 @@
+# bench_pump.py — построчный скоринг Pump.fun против колоночного (pump_engine.add_signals)
+# Сначала проверяет точное совпадение результатов, потом меряет время.
+#   python benchmarks/bench_pump.py [--sizes 250,1000,5000] [--repeat 5] [--json]
+
+import os, sys, json, time, argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pump_engine import pump_norm, meme_score, meme_signal, add_signals, SIGNAL_COLS
+
+def synthetic_items(n, seed=0):
+    """Сырые ответы Pump.fun: часть пустых/нулевых полей, как в живом потоке."""
+    r = np.random.default_rng(seed)
+    items = []
+    for i in range(n):
+        it = {"mint": f"M{i:08d}", "symbol": f"t{i}", "name": f"Token {i}",
+              "usd_market_cap": float(r.lognormal(9, 2)) if r.random() > 0.1 else 0,
+              "supply": 1_000_000_000,
+              "txns_5m": int(r.poisson(20)) if r.random() > 0.2 else 0,
+              "volume_5m": float(r.lognormal(6, 2)) if r.random() > 0.2 else 0.0,
+              "liquidity_usd": float(r.lognormal(8, 2)) if r.random() > 0.15 else 0.0,
+              "price_change_5m": float(r.normal(0, 5)) if r.random() > 0.1 else 0.0,
+              "created_timestamp": 1_700_000_000_000 + i}
+        items.append(it)
+    return items
+
+def rowwise(df):
+    # так работал сканер: df.apply(meme_score) + meme_signal на каждую запись
+    out = df.copy()
+    out["score"] = out.apply(meme_score, axis=1)
+    sigs = [meme_signal(rec) for rec in out.to_dict(orient="records")]
+    for c in SIGNAL_COLS: out[c] = [s.get(c, np.nan) for s in sigs]
+    return out
+
+def check_equal(a, b):
+    for c in ["score"] + SIGNAL_COLS:
+        x, y = a[c].to_numpy(), b[c].to_numpy()
+        if c == "side":
+            assert (x == y).all(), c
+        else:
+            x, y = x.astype(float), y.astype(float)
+            same = (x == y) | (np.isnan(x) & np.isnan(y))
+            assert same.all(), f"{c}: {int((~same).sum())} расхождений"
+
+def best_of(fn, repeat):
+    ts = []
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); ts.append(time.perf_counter() - t0)
+    return min(ts)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="250,1000,5000,20000")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--json", action="store_true", help="JSON-строка на размер вместо таблицы")
+    a = ap.parse_args(argv)
+
+    for n in [int(x) for x in a.sizes.split(",")]:
+        df = pd.DataFrame([pump_norm(x) for x in synthetic_items(n)])
+        df = df[df["price_usd"] > 0]
+        check_equal(rowwise(df), add_signals(df))
+        t_row = best_of(lambda: rowwise(df), a.repeat)
+        t_col = best_of(lambda: add_signals(df), a.repeat)
+        res = {"rows": len(df), "rowwise_ms": round(t_row*1000, 3), "columnar_ms": round(t_col*1000, 3),
+               "speedup": round(t_row/t_col, 1) if t_col else None}
+        if a.json: print(json.dumps(res))
+        else: print(f"{res['rows']:>7} строк | построчно {res['rowwise_ms']:>9.2f} мс | колонками {res['columnar_ms']:>8.2f} мс | ×{res['speedup']}")
+
+if __name__ == "__main__":
+    main()
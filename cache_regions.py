@@ -0,0 +1,121 @@
+# cache_regions.py — именованные кэши процесса вместо общего st.cache_data
+# Регион (лента pump.fun, цены, ряды цен, поиск монет) живёт своим TTL и сбрасывается отдельно:
+# «Обновить» в сканере больше не выкидывает чужие ряды и цены у всех сессий разом.
+#   fresh  (возраст < ttl)          — отдаём как есть
+#   stale  (ttl ≤ возраст < ttl+stale) — отдаём старое сразу, одно обновление уходит в фон
+#   нет / совсем старое             — грузим; одновременные промахи по ключу ждут один запрос
+# Ошибка загрузки не кэшируется: ждущие получают исключение, фоновая ошибка оставляет старое значение.
+# keep(значение) → False — результат отдаётся ждущим, но не сохраняется (например, «цены нет» после сбоя сети).
+
+import time, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import perf_trace, http_client
+
+REFRESH_WORKERS = 4
+WAIT = 60             # сек, сколько ждущий промах ждёт чужую загрузку
+
+_lock = threading.Lock()
+_regions = {}         # имя -> Region
+_pool = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="cache-refresh")
+
+def _in_background(fn, *args):
+    with http_client.background(): fn(*args)
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+    def __init__(self):
+        self.done, self.value, self.error = threading.Event(), None, None
+
+class Region:
+    def __init__(self, name, ttl, stale=0, max_items=512, on_clear=None, keep=None):
+        self.name, self.ttl, self.stale, self.max_items, self.keep = name, ttl, stale, max_items, keep
+        self.on_clear = on_clear   # on_clear() — сброс нижележащего кэша (price_service и т.п.) вместе с регионом
+        self._data = OrderedDict() # ключ -> (значение, ts)
+        self._inflight = {}        # ключ -> _Flight
+        self._lock = threading.Lock()
+        self._stats = {"hit": 0, "stale": 0, "miss": 0, "wait": 0, "refresh": 0, "errors": 0}
+
+    def _load(self, key, loader, fl):
+        try:
+            fl.value = loader()
+            if self.keep is not None and not self.keep(fl.value): return
+            with self._lock:
+                self._data[key] = (fl.value, time.time()); self._data.move_to_end(key)
+                while len(self._data) > self.max_items: self._data.popitem(last=False)
+        except Exception as e:
+            fl.error = e
+            with self._lock: self._stats["errors"] += 1
+        finally:
+            with self._lock: self._inflight.pop(key, None)
+            fl.done.set()
+
+    def get(self, key, loader):
+        """Значение по ключу; loader() — загрузка при промахе/устаревании."""
+        now = time.time(); lead = False
+        with self._lock:
+            v = self._data.get(key)
+            age = now - v[1] if v else None
+            if v and age < self.ttl:
+                self._stats["hit"] += 1; self._data.move_to_end(key)
+                kind = "hit"
+            elif v and age < self.ttl + self.stale:
+                self._stats["stale"] += 1; kind = "stale"
+                if key not in self._inflight:
+                    fl = self._inflight[key] = _Flight(); self._stats["refresh"] += 1
+                    _pool.submit(_in_background, self._load, key, loader, fl)
+            else:
+                fl = self._inflight.get(key)
+                if fl is None:
+                    fl = self._inflight[key] = _Flight(); lead = True
+                    self._stats["miss"] += 1; kind = "miss"
+                else:
+                    self._stats["wait"] += 1; kind = "wait"
+        perf_trace.cache_event(self.name, kind in ("hit", "stale"))
+        if kind in ("hit", "stale"): return v[0]
+        if lead: self._load(key, loader, fl)
+        elif not fl.done.wait(WAIT): raise TimeoutError(f"{self.name}: загрузка {key!r} не закончилась за {WAIT} с")
+        if fl.error is not None: raise fl.error
+        return fl.value
+
+    def invalidate(self, key=None):
+        """Сбросить ключ или весь регион (идущие загрузки допишут свежие значения)."""
+        with self._lock:
+            if key is None: self._data.clear()
+            else: self._data.pop(key, None)
+        if self.on_clear and key is None: self.on_clear()
+
+    def stats(self):
+        with self._lock:
+            return {"region": self.name, "ttl_s": self.ttl, "stale_s": self.stale, "keys": len(self._data),
+                    "inflight": len(self._inflight), **self._stats}
+
+def region(name, ttl=60, stale=0, max_items=512, on_clear=None, keep=None):
+    """Регион по имени; создаётся при первом обращении (повторные вызовы отдают тот же)."""
+    with _lock:
+        r = _regions.get(name)
+        if r is None:
+            r = _regions[name] = Region(name, ttl, stale, max_items, on_clear, keep)
+        return r
+
+def cached(name, ttl=60, stale=0, max_items=512, on_clear=None, keep=None):
+    """Декоратор: результат fn(*args, **kw) в регионе name, ключ — аргументы (должны быть хэшируемы)."""
+    r = region(name, ttl, stale, max_items, on_clear, keep)
+    def deco(fn):
+        def wrapper(*args, **kw):
+            return r.get((args, tuple(sorted(kw.items()))), lambda: fn(*args, **kw))
+        wrapper.__name__, wrapper.__doc__, wrapper.region = fn.__name__, fn.__doc__, r
+        return wrapper
+    return deco
+
+def invalidate(*names):
+    """Сбросить регионы по именам (без имён — все)."""
+    with _lock:
+        rs = [r for n, r in _regions.items() if not names or n in names]
+    for r in rs: r.invalidate()
+
+def stats():
+    """Строка на регион — для панели производительности."""
+    with _lock:
+        rs = list(_regions.values())
+    return [r.stats() for r in rs]
@@ -0,0 +1,121 @@
+# coin_index.py — локальный индекс монет CoinGecko вместо /search на каждый ввод
+# Источник — /coins/list?include_platform=true (id, symbol, name, адреса контрактов по сетям)
+# + места по капитализации из /coins/markets (для ранжирования, как у /search).
+# Точные совпадения — хэш-таблицы по id / имени / тикеру / контракту, неточные — префиксный поиск
+# по отсортированным ключам. Индекс сохраняется на диск и обновляется в фоне.
+
+import time, bisect, threading
+import http_client, disk_store
+
+COINGECKO_URL = "https://api.coingecko.com/api/v3"
+INDEX_FILE = "coin_index.json"
+REFRESH_EVERY = 24*3600   # сек: список монет меняется медленно
+RANK_PAGES = 4            # 4 × 250 монет с местом по капитализации, остальные — в конце
+PREFIX_LIMIT = 50         # сколько префиксных кандидатов ранжируем
+RETRY_AFTER = 300         # сек между попытками пересборки, если прошлая не удалась
+
+_lock = threading.Lock()
+_index = None             # dict: exact, contracts, keys, rank, built_at
+_refreshing = False
+_attempt_at = 0.0
+_stats = {"hit": 0, "miss": 0}
+
+def _build(coins, ranks, built_at):
+    exact, contracts, pairs = {}, {}, set()
+    for cid, sym, name, platforms in coins:
+        for k in {cid.lower(), (name or "").lower().strip(), (sym or "").lower().strip()}:
+            if k:
+                exact.setdefault(k, []).append(cid); pairs.add((k, cid))
+        for addr in (platforms or {}).values():
+            if addr: contracts.setdefault(addr.lower(), cid)
+    rk = lambda cid: (ranks.get(cid, 10**9), cid)
+    for k in exact: exact[k].sort(key=rk)
+    return {"exact": exact, "contracts": contracts, "keys": sorted(pairs), "rank": ranks,
+            "count": len(coins), "built_at": built_at}
+
+def _download(base_url):
+    r = http_client.get(f"{base_url}/coins/list", params={"include_platform": "true"}, endpoint="coingecko", timeout=30)
+    r.raise_for_status()
+    coins = [[c.get("id",""), c.get("symbol",""), c.get("name",""), c.get("platforms") or {}] for c in r.json() if c.get("id")]
+    ranks = {}
+    for page in range(1, RANK_PAGES+1):
+        try:
+            m = http_client.get(f"{base_url}/coins/markets", endpoint="coingecko",
+                                params={"vs_currency":"usd","order":"market_cap_desc","per_page":250,"page":page})
+            if m.status_code != 200: break
+            for i, c in enumerate(m.json()):
+                ranks[c["id"]] = c.get("market_cap_rank") or (page-1)*250 + i + 1
+        except Exception:
+            break  # без мест индекс всё равно рабочий, просто хуже ранжирует тикеры-дубли
+    return coins, ranks
+
+def _refresh(base_url):
+    global _index, _refreshing
+    try:
+        with http_client.background():
+            coins, ranks = _download(base_url)
+        built_at = time.time()
+        idx = _build(coins, ranks, built_at)
+        with _lock: _index = idx
+        disk_store.save_json(INDEX_FILE, {"built_at": built_at, "coins": coins, "ranks": ranks})
+    except Exception:
+        pass  # остаёмся на старом индексе (или без него — тогда работает сетевой поиск)
+    finally:
+        _refreshing = False
+
+def ensure_loaded(base_url=COINGECKO_URL):
+    """Поднять индекс с диска; если его нет или он устарел — пересобрать в фоне."""
+    global _index, _refreshing, _attempt_at
+    with _lock:
+        if _index is None:
+            d = disk_store.load_json(INDEX_FILE)
+            if d and d.get("coins"):
+                _index = _build(d["coins"], d.get("ranks") or {}, d.get("built_at", 0))
+        stale = _index is None or time.time() - _index["built_at"] > REFRESH_EVERY
+        if stale and not _refreshing and time.time() - _attempt_at > RETRY_AFTER:
+            _refreshing, _attempt_at = True, time.time()
+            threading.Thread(target=_refresh, args=(base_url,), daemon=True, name="coin-index").start()
+    return _index is not None
+
+def _best(ids, rank):
+    return min(ids, key=lambda cid: (rank.get(cid, 10**9), cid))
+
+def resolve(query):
+    """
+    id CoinGecko по тикеру / имени / id / адресу контракта или None (индекс ещё не готов / не нашли).
+    Как и прежний cg_search_id: точное совпадение первым, среди равных — большая капитализация.
+    """
+    q = (query or "").strip().lower()
+    if not q or not ensure_loaded():
+        return None
+    idx = _index
+    cid = idx["contracts"].get(q)
+    if cid is None and q in idx["exact"]:
+        cid = idx["exact"][q][0]
+    if cid is None:
+        keys = idx["keys"]; i = bisect.bisect_left(keys, (q, ""))
+        cand = []
+        while i < len(keys) and keys[i][0].startswith(q) and len(cand) < PREFIX_LIMIT:
+            cand.append(keys[i][1]); i += 1
+        if cand: cid = _best(cand, idx["rank"])
+    _stats["hit" if cid else "miss"] += 1
+    return cid
+
+def patterns(max_rank=1000, min_len=3):
+    """{имя / тикер / id (нижний регистр): id монеты} для монет не ниже max_rank — шаблоны поиска в текстах."""
+    idx = _index
+    if idx is None: return {}
+    rank = idx["rank"]; out = {}
+    for k, ids in idx["exact"].items():
+        cid = ids[0]
+        if len(k) >= min_len and rank.get(cid, 10**9) <= max_rank: out[k] = cid
+    return out
+
+def built_at():
+    idx = _index
+    return idx["built_at"] if idx else 0.0
+
+def stats():
+    idx = _index
+    return dict(_stats, coins=idx["count"] if idx else 0,
+                age_s=round(time.time()-idx["built_at"]) if idx else None, refreshing=_refreshing)
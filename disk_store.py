@@ -0,0 +1,25 @@
+# disk_store.py — локальный JSON-кэш на диске (общий для feed_cache, translation и др.)
+# Запись атомарная (tmp + replace); любые ошибки диска глотаем — кэш лишь ускорение.
+
+import os, json
+
+CACHE_DIR = os.environ.get("CRYPTO_BOT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+
+def path(name):
+    return os.path.join(CACHE_DIR, name)
+
+def load_json(name, default=None):
+    try:
+        with open(path(name), encoding="utf-8") as f: return json.load(f)
+    except Exception:
+        return default
+
+def save_json(name, obj):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = path(name) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f: json.dump(obj, f, ensure_ascii=False)
+        os.replace(tmp, path(name))
+        return True
+    except Exception:
+        return False
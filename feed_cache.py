@@ -0,0 +1,84 @@
+# feed_cache.py — кэш RSS-фидов с условными запросами
+# На каждый URL храним ETag / Last-Modified и уже разобранные записи.
+# Повторный запрос идёт с If-None-Match / If-Modified-Since; на 304 отдаём готовые записи без feedparser.
+# Кэш лежит на диске (JSON), поэтому после рестарта первый запрос тоже условный.
+
+import time, threading, atexit
+import http_client, disk_store, perf_trace
+from startup_timing import lazy_import
+
+CACHE_FILE = "feeds.json"
+MAX_FEEDS = 150      # поисковых URL Google News много — старые вытесняем
+SAVE_EVERY = 10.0    # не чаще раза в N сек пишем файл (остальное допишет atexit)
+MAX_ENTRIES = 40     # записей на фид храним с запасом (потребители берут 8–18)
+ENTRY_FIELDS = ("title", "summary", "description")
+
+_lock = threading.Lock()
+_feeds = None        # url -> {"etag", "modified", "entries", "ts"}
+_stats = {"hit": 0, "miss": 0}
+_saved_at = 0.0
+_dirty = False
+
+def _load():
+    global _feeds
+    if _feeds is None:
+        _feeds = disk_store.load_json(CACHE_FILE, {}) or {}
+    return _feeds
+
+def _save(force=False):
+    # вызывать под _lock
+    global _saved_at, _dirty
+    _dirty = True
+    if _feeds is None or (not force and time.time() - _saved_at < SAVE_EVERY):
+        return
+    if disk_store.save_json(CACHE_FILE, _feeds):
+        _saved_at, _dirty = time.time(), False
+
+@atexit.register
+def _flush():
+    with _lock:
+        if _dirty: _save(force=True)
+
+def _evict():
+    if len(_feeds) > MAX_FEEDS:
+        for url in sorted(_feeds, key=lambda u: _feeds[u].get("ts", 0))[:len(_feeds)-MAX_FEEDS]:
+            del _feeds[url]
+
+def get_entries(url, headers=None, timeout=None, max_age=0):
+    """
+    Записи фида как список dict (title/summary/description).
+    max_age — если фид проверялся не раньше max_age сек назад (например, фоновым prefetch),
+    записи отдаются без запроса. Ошибки сети/HTTP пробрасываются — их ловит вызывающий.
+    """
+    with _lock:
+        cached = _load().get(url)
+    if cached and max_age and time.time() - cached.get("ts", 0) < max_age:
+        perf_trace.cache_event("rss", True)
+        return cached["entries"]
+    h = dict(headers or {})
+    if cached:
+        if cached.get("etag"): h["If-None-Match"] = cached["etag"]
+        if cached.get("modified"): h["If-Modified-Since"] = cached["modified"]
+
+    r = http_client.get(url, headers=h, endpoint="rss", timeout=timeout)
+    if r.status_code == 304 and cached:
+        with _lock:
+            cached["ts"] = time.time(); _stats["hit"] += 1
+        perf_trace.cache_event("rss", True)
+        return cached["entries"]
+    r.raise_for_status()
+
+    perf_trace.cache_event("rss", False)
+    d = lazy_import("feedparser").parse(r.content)  # грузится с первым полным ответом, не при старте
+    entries = [{k: e.get(k, "") for k in ENTRY_FIELDS} for e in d.entries[:MAX_ENTRIES]]
+    with _lock:
+        _stats["miss"] += 1
+        _load()[url] = {"etag": r.headers.get("ETag"), "modified": r.headers.get("Last-Modified"),
+                        "entries": entries, "ts": time.time()}
+        _evict(); _save()
+    return entries
+
+def stats():
+    """Счётчики: hit — ответ 304 (фид не менялся), miss — полная загрузка и разбор."""
+    with _lock:
+        return dict(_stats, feeds=len(_load()))
@@ -0,0 +1,248 @@
+# http_client.py — общий HTTP-клиент процесса
+# Одна requests.Session на процесс: keep-alive по хостам, лимит соединений в пуле,
+# ретраи 5xx с джиттер-бэкоффом, свой таймаут на каждый эндпоинт.
+# Над сессией — планировщик по хостам (общий для всех сессий Streamlit):
+#   token bucket на хост (RATE_LIMITS) — запросы ждут токен в очереди, интерактивные впереди фоновых;
+#   одинаковые запросы в пути склеиваются — ответ один на всех ждущих;
+#   429 ставит хост на паузу (Retry-After) и повторяется через ту же очередь, а если не вышло —
+#   поднимается Throttled, чтобы «упёрлись в лимит» не выглядело как «монета не найдена».
+# Фоновые задачи (prefetch, обновление кэшей) оборачивают работу в `with background():`.
+
+import os, time, random, heapq, threading, contextvars
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import perf_trace
+
+POOL_HOSTS = 10        # сколько хостов держим в пуле (CoinGecko, pump.fun, RSS-фиды)
+POOL_PER_HOST = 16     # максимум открытых соединений на хост
+POOL_BLOCK = True      # при исчерпании пула ждём свободное соединение, а не открываем лишнее
+
+# Таймауты по эндпоинтам, сек. Явный timeout= в get() важнее.
+TIMEOUTS = {
+    "coingecko": 8,
+    "pumpfun": 15,
+    "rss": 6,
+    "probe": 10,
+}
+DEFAULT_TIMEOUT = 10
+
+RETRY_STATUSES = (500, 502, 503, 504)   # 429 разбирает планировщик, а не urllib3
+
+# Лимиты по хостам: (запросов в сек, размер пачки). Хосты без записи не ограничиваются,
+# но пауза по 429 действует и для них. Переопределение: CRYPTO_BOT_RATE_LIMITS="host=0.5/8,host2=5/20".
+RATE_LIMITS = {
+    "api.coingecko.com": (0.5, 8),   # бесплатный тариф: ~30 запросов в минуту
+}
+INTERACTIVE, BACKGROUND = 0, 1      # приоритет: меньше — раньше
+MAX_WAIT = {INTERACTIVE: 15.0, BACKGROUND: 120.0}   # сек в очереди, дальше — Throttled
+THROTTLE_RETRIES = 2                # повторов после 429 (через очередь хоста)
+DEFAULT_RETRY_AFTER = 5.0           # пауза хоста, если 429 без Retry-After
+
+class _JitterRetry(Retry):
+    # экспоненциальный бэкофф ×[0.5; 1.5), чтобы сессии не долбили API синхронно
+    def get_backoff_time(self):
+        t = super().get_backoff_time()
+        return t * random.uniform(0.5, 1.5) if t > 0 else 0
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        # 429 с Retry-After urllib3 повторил бы сам, мимо очереди хоста
+        return status_code != 429 and super().is_retry(method, status_code, has_retry_after)
+
+def _retry():
+    return _JitterRetry(
+        total=3, connect=2, read=1, status=3,
+        backoff_factor=0.6,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # после последней попытки отдаём ответ как есть, статус проверяет вызывающий
+    )
+
+class Throttled(requests.HTTPError):
+    """Хост ограничил частоту (429) или очередь к нему дольше MAX_WAIT; retry_after — сек до снятия паузы."""
+    def __init__(self, host, retry_after=0.0, reason="429"):
+        super().__init__(f"{host}: throttled ({reason}), retry in {retry_after:.0f}s")
+        self.host, self.retry_after, self.reason = host, retry_after, reason
+
+def _env_limits():
+    out = dict(RATE_LIMITS)
+    for part in os.environ.get("CRYPTO_BOT_RATE_LIMITS", "").split(","):
+        host, _, spec = part.partition("=")
+        rate, _, burst = spec.partition("/")
+        try: out[host.strip()] = (float(rate), float(burst or 1))
+        except ValueError: pass
+    return out
+
+_limits = _env_limits()
+_priority = contextvars.ContextVar("http_priority", default=INTERACTIVE)
+
+@contextmanager
+def background():
+    """Запросы внутри блока (и в пулах, куда контекст передан через perf_trace.bind) идут фоновыми."""
+    token = _priority.set(BACKGROUND)
+    try: yield
+    finally: _priority.reset(token)
+
+class _Bucket:
+    # очередь к хосту: куча (приоритет, номер); токен получает голова кучи
+    def __init__(self, host, rate=None, burst=1.0):
+        self.host, self.rate, self.burst = host, rate, burst
+        self.tokens, self.stamp, self.paused_until, self.throttled_at = burst, time.monotonic(), 0.0, None
+        self.queue, self.seq = [], 0
+        self.cond = threading.Condition()
+        self.stats = {"granted": 0, "waited": 0, "wait_ms": 0.0, "max_wait_ms": 0.0, "throttled": 0, "timeouts": 0,
+                      "coalesced": 0}
+
+    def _refill(self, now):
+        if self.rate: self.tokens = min(self.burst, self.tokens + (now - self.stamp)*self.rate)
+        self.stamp = now
+
+    def acquire(self, prio, deadline):
+        """Ждёт своей очереди и токена; возвращает мс ожидания. После deadline (monotonic) — Throttled."""
+        t0 = time.monotonic()
+        with self.cond:
+            self.seq += 1; me = (prio, self.seq); heapq.heappush(self.queue, me)
+            perf_trace.gauge("http_queue_depth", self.host, len(self.queue))
+            try:
+                while True:
+                    now = time.monotonic(); self._refill(now)
+                    pause = self.paused_until - now
+                    if self.queue[0] == me and pause <= 0 and (not self.rate or self.tokens >= 1):
+                        heapq.heappop(self.queue)
+                        if self.rate: self.tokens -= 1
+                        break
+                    if now >= deadline:
+                        self.stats["timeouts"] += 1; self.throttled_at = now
+                        raise Throttled(self.host, max(pause, 0.0), reason="queue")
+                    need = pause if pause > 0 else (1 - self.tokens)/self.rate if self.rate and self.tokens < 1 else 0.05
+                    self.cond.wait(min(max(need, 0.01), deadline - now))
+            finally:
+                if me in self.queue: self.queue.remove(me); heapq.heapify(self.queue)
+                perf_trace.gauge("http_queue_depth", self.host, len(self.queue))
+                self.cond.notify_all()
+            ms = (time.monotonic() - t0)*1000
+            s = self.stats; s["granted"] += 1; s["wait_ms"] += ms; s["max_wait_ms"] = max(s["max_wait_ms"], ms)
+            if ms >= 1: s["waited"] += 1
+            return ms
+
+    def pause(self, sec):
+        with self.cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + sec)
+            self.tokens = 0.0 if self.rate else self.tokens
+            self.stats["throttled"] += 1; self.throttled_at = time.monotonic()
+            self.cond.notify_all()
+
+    def snapshot(self):
+        with self.cond:
+            now = time.monotonic(); self._refill(now)
+            return {"host": self.host, "rate_per_s": self.rate, "burst": self.burst, "queue": len(self.queue),
+                    "tokens": round(self.tokens, 2) if self.rate else None,
+                    "paused_s": round(max(0.0, self.paused_until - now), 1), **self.stats,
+                    "wait_ms": round(self.stats["wait_ms"]), "max_wait_ms": round(self.stats["max_wait_ms"])}
+
+class _Flight:
+    # один запрос в пути; ждущие того же ключа получают его ответ или исключение
+    __slots__ = ("done", "resp", "error", "followers")
+    def __init__(self):
+        self.done, self.resp, self.error, self.followers = threading.Event(), None, None, 0
+
+_buckets = {}
+_inflight = {}      # ключ запроса -> _Flight
+_sched_lock = threading.Lock()
+
+def _bucket(host):
+    with _sched_lock:
+        b = _buckets.get(host)
+        if b is None:
+            rate, burst = _limits.get(host, (None, 1.0))
+            b = _buckets[host] = _Bucket(host, rate, burst)
+        return b
+
+def _retry_after(r):
+    try: return max(0.0, float(r.headers.get("Retry-After", DEFAULT_RETRY_AFTER)))
+    except (TypeError, ValueError): return DEFAULT_RETRY_AFTER
+
+def _key(url, params, headers):
+    items = lambda d: tuple(sorted((str(k), str(v)) for k, v in (d or {}).items()))
+    return (url, items(params), items(headers))
+
+_session = None
+_lock = threading.Lock()
+
+def session():
+    """Общая сессия процесса (создаётся при первом обращении)."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                s = requests.Session()
+                ad = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST,
+                                 pool_block=POOL_BLOCK, max_retries=_retry())
+                s.mount("https://", ad); s.mount("http://", ad)
+                _session = s
+    return _session
+
+def _send(url, params, headers, timeout, endpoint, prio):
+    host = urlsplit(url).hostname or ""
+    b = _bucket(host); deadline = time.monotonic() + MAX_WAIT.get(prio, MAX_WAIT[INTERACTIVE])
+    for attempt in range(THROTTLE_RETRIES + 1):
+        wait_ms = b.acquire(prio, deadline)
+        perf_trace.queue_event(host, "background" if prio == BACKGROUND else "interactive", wait_ms)
+        t0 = time.perf_counter()
+        try:
+            r = session().get(url, params=params, headers=headers, timeout=timeout)
+        except Exception as e:
+            perf_trace.http_event(endpoint, url, "error", 0, (time.perf_counter()-t0)*1000, f"{type(e).__name__}", wait_ms)
+            raise
+        perf_trace.http_event(endpoint, url, r.status_code, len(r.content), (time.perf_counter()-t0)*1000, None, wait_ms)
+        if r.status_code != 429: return r
+        ra = _retry_after(r); b.pause(ra)
+        if time.monotonic() + ra > deadline: break   # пауза дольше, чем можно ждать — сдаёмся сразу
+    raise Throttled(host, ra)
+
+def get(url, params=None, endpoint=None, timeout=None, headers=None, priority=None):
+    """
+    GET через общий пул и очередь хоста. endpoint — ключ из TIMEOUTS (coingecko/pumpfun/rss/probe);
+    priority — INTERACTIVE / BACKGROUND (по умолчанию — из контекста, см. background()).
+    Одинаковый запрос, уже идущий в другом потоке, не повторяется: ждём его ответ.
+    429, не снятый повторами, и слишком долгая очередь — исключение Throttled.
+    """
+    if timeout is None:
+        timeout = TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+    prio = _priority.get() if priority is None else priority
+    key = _key(url, params, headers)
+    with _sched_lock:
+        fl = _inflight.get(key)
+        lead = fl is None
+        if lead: fl = _inflight[key] = _Flight()
+        else: fl.followers += 1
+    if not lead:
+        b = _bucket(urlsplit(url).hostname or "")
+        with b.cond: b.stats["coalesced"] += 1
+        perf_trace.cache_event("http_inflight", True)
+        fl.done.wait(timeout*(THROTTLE_RETRIES+1) + MAX_WAIT.get(prio, MAX_WAIT[INTERACTIVE]))
+        if fl.error is not None: raise fl.error
+        if fl.resp is None: raise requests.Timeout(f"{url}: общий запрос не завершился")
+        return fl.resp
+    try:
+        fl.resp = _send(url, params, headers, timeout, endpoint, prio)
+        return fl.resp
+    except Exception as e:
+        fl.error = e; raise
+    finally:
+        with _sched_lock: _inflight.pop(key, None)
+        fl.done.set()
+
+def throttled(host, within=60.0):
+    """Упирался ли хост в лимит (429 / переполненная очередь) за последние within сек — для сообщений в UI."""
+    b = _buckets.get(host)
+    return bool(b and b.throttled_at is not None and time.monotonic() - b.throttled_at < within)
+
+def limiter_stats():
+    """Строка на хост: лимит, очередь, ожидание, 429 — для панели производительности."""
+    with _sched_lock:
+        bs = list(_buckets.values())
+    return [b.snapshot() for b in bs]
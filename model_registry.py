@@ -0,0 +1,62 @@
+# model_registry.py — предикторы, которые обучаются/загружаются один раз на процесс
+# Модель берётся из MODEL_DIR/<имя>.joblib, если файл есть (так подменяются реально обученные
+# модели), иначе строится фабрикой из реестра. Дальше живёт до конца процесса.
+# predict_many — векторный прогноз сразу для списка/массива настроений (watchlist, вселенная монет).
+
+import os, threading
+import numpy as np
+from startup_timing import lazy_import
+
+MODEL_DIR = os.environ.get("CRYPTO_BOT_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+DEFAULT_MODEL = "sentiment_ridge"
+FLAT_BAND = 0.05   # |прогноз| ниже — "flat"
+
+_lock = threading.Lock()
+_factories = {}
+_models = {}
+
+def register(name, factory):
+    """factory() → объект с predict(X); X — массив формы (n, 1)."""
+    _factories[name] = factory
+    _models.pop(name, None)
+
+def _sentiment_ridge():
+    # исходная игрушечная модель: 11 точек на [-1; 1], цель = 2·настроение
+    Ridge = lazy_import("sklearn.linear_model").Ridge
+    m = Ridge(alpha=0.5); X = np.array([[x] for x in np.linspace(-1, 1, 11)])
+    m.fit(X, X.flatten()*2.0)
+    return m
+
+register(DEFAULT_MODEL, _sentiment_ridge)
+
+def get(name=DEFAULT_MODEL):
+    m = _models.get(name)
+    if m is None:
+        with _lock:
+            m = _models.get(name)
+            if m is None:
+                path = os.path.join(MODEL_DIR, f"{name}.joblib")
+                if os.path.exists(path):
+                    m = lazy_import("joblib").load(path)
+                else:
+                    m = _factories[name]()
+                _models[name] = m
+    return m
+
+def warm(*names):
+    """Построить/загрузить модели заранее (например, при старте процесса)."""
+    for n in (names or tuple(_factories)): get(n)
+
+def predict_many(sentiments, name=DEFAULT_MODEL):
+    """Прогноз % для каждого настроения → np.ndarray той же длины."""
+    s = np.asarray(sentiments, dtype=float).reshape(-1, 1)
+    if not len(s): return np.empty(0)
+    return get(name).predict(s)
+
+def directions(preds):
+    p = np.asarray(preds, dtype=float)
+    return np.where(p > FLAT_BAND, "up", np.where(p < -FLAT_BAND, "down", "flat"))
+
+def simple_predict(s, name=DEFAULT_MODEL):
+    p = float(predict_many([s], name)[0])
+    return ("up" if p>FLAT_BAND else "down" if p<-FLAT_BAND else "flat"), p
@@ -0,0 +1,110 @@
+# near_dup.py — поиск почти-дублей новостей (MinHash + LSH)
+# Один сюжет разносят Google News, CoinDesk и Cointelegraph с мелкими правками формулировок —
+# точный дедуп по тексту их пропускает, и каждый стоит перевода, оценки тона и перекоса среднего.
+# Текст → множество шинглов (5 байт нормализованного текста) → MinHash-подпись → полосы LSH.
+# Кандидаты — только тексты с общей полосой; их отсеивает оценка по подписям (одна операция numpy),
+# прошедшие проверяются точно (Жаккар по шинглам);
+# корзина полосы помнит последних MAX_BUCKET представителей, а кандидатов на один текст берётся не больше
+# MAX_CANDIDATES (с наибольшим числом общих полос) — добавление текста O(1), весь пул линейный
+# даже на однообразных заголовках.
+# Кластер держит первого представителя; остальные тексты сюжета считаются дублями.
+#   CRYPTO_BOT_DUP_THRESHOLD=0.6   — порог сходства по Жаккару (1.0 — только точные совпадения)
+
+import os, re
+import numpy as np
+
+THRESHOLD = float(os.environ.get("CRYPTO_BOT_DUP_THRESHOLD", "0.6"))
+SHINGLE = 5            # байт UTF-8 в шингле: переживает окончания и замену слова («below» → «under»)
+NUM_PERM = 48          # длина подписи
+BANDS = 16             # полос LSH × 3 строки: пара с Жаккаром 0.6 — кандидат с вероятностью ~98%, 0.2 — ~12%
+MAX_BUCKET = 16        # представителей в корзине полосы (последние)
+MAX_CANDIDATES = 24    # кандидатов на один add всего (по числу общих полос): цена add не растёт с пулом
+EST_MARGIN = 0.2       # точная проверка, если оценка по подписи ≥ порог − запас (~3σ при 48 хэшах)
+
+# семейство хэшей (x xor s)·m по модулю 2^64 (нечётные m): без деления, переполнение uint64 — часть хэша
+_rng = np.random.default_rng(20240601)
+_S = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)[:, None]
+_M = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)[:, None] * np.uint64(2) + np.uint64(1)
+_WORD = re.compile(r"\w+")
+
+def shingles(text):
+    """Множество подстрок по SHINGLE байт (как целые числа); регистр и пунктуация не важны."""
+    s = " ".join(_WORD.findall((text or "").lower())).encode("utf-8")
+    if len(s) <= SHINGLE: return {int.from_bytes(s, "little")} if s else set()
+    # скользящее окно колонками numpy: k-й байт окна — сдвиг на 8k бит
+    b = np.frombuffer(s, dtype=np.uint8).astype(np.uint64); n = len(b) - SHINGLE + 1
+    x = b[:n].copy()
+    for k in range(1, SHINGLE): x |= b[k:k+n] << np.uint64(8*k)
+    return set(x.tolist())
+
+def signature(sh):
+    """MinHash-подпись множества шинглов (NUM_PERM чисел)."""
+    x = np.fromiter(sh, dtype=np.uint64, count=len(sh))
+    return ((x ^ _S) * _M).min(axis=1)
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+class NearDupIndex:
+    """
+    Инкрементальный индекс: add(text) → номер представителя кластера (свой номер, если текст новый).
+    Номера — порядок добавления.
+    """
+    def __init__(self, threshold=None):
+        self.threshold = THRESHOLD if threshold is None else threshold
+        self._rows = NUM_PERM // BANDS
+        self._buckets = {}   # (полоса, байты полосы) -> [номера представителей]
+        self._sets = []      # номер -> шинглы (только у представителей, у дублей None)
+        self._sigs = np.empty((64, NUM_PERM), dtype=np.uint64)   # строка i — подпись текста i (растёт удвоением)
+        self.sizes = {}      # номер представителя -> размер кластера
+
+    def __len__(self):
+        return len(self._sets)
+
+    def add(self, text):
+        sh = shingles(text); i = len(self._sets)
+        if not sh:
+            self._sets.append(None); self.sizes[i] = 1; return i
+        sig = signature(sh); raw = sig.tobytes(); step = self._rows*8
+        keys = [(b, raw[b*step:(b+1)*step]) for b in range(BANDS)]
+        hits = {}
+        for k in keys:
+            for j in self._buckets.get(k, ()): hits[j] = hits.get(j, 0) + 1
+        cand = sorted(hits, key=hits.__getitem__, reverse=True)[:MAX_CANDIDATES] if len(hits) > MAX_CANDIDATES else list(hits)
+        if cand:
+            est = (self._sigs[cand] == sig).mean(axis=1)
+            for n in np.argsort(-est, kind="stable"):
+                if est[n] < self.threshold - EST_MARGIN: break
+                j = cand[n]
+                if jaccard(sh, self._sets[j]) >= self.threshold:
+                    self._sets.append(None); self.sizes[j] += 1; return j
+        if i >= len(self._sigs): self._sigs = np.concatenate([self._sigs, np.empty_like(self._sigs)])
+        self._sets.append(sh); self._sigs[i] = sig; self.sizes[i] = 1
+        for k in keys:
+            b = self._buckets.setdefault(k, []); b.append(i)
+            if len(b) > MAX_BUCKET: del b[0]
+        return i
+
+def clusters(texts, threshold=None):
+    """Номер представителя для каждого текста (первый текст сюжета — представитель)."""
+    idx = NearDupIndex(threshold)
+    return [idx.add(t) for t in texts]
+
+def norm_key(s):
+    """Ключ точного дедупа: только буквы и цифры в нижнем регистре."""
+    return re.sub(r"\W+", "", (s or "").lower())
+
+def dedup(items, text=lambda x: x, threshold=None, key=None):
+    """
+    Элементы без почти-дублей: по одному (первому) на сюжет, в исходном порядке.
+    key — первый проход точным дедупом по norm_key(key(x)) (например, заголовку): один заголовок
+    с разными анонсами по Жаккару текста далёк (~0.2), но это та же новость.
+    """
+    idx = NearDupIndex(threshold); out = []; seen = set()
+    for it in items:
+        if key is not None:
+            k = norm_key(key(it))
+            if k in seen: continue
+            seen.add(k)
+        if idx.add(text(it)) == len(idx) - 1: out.append(it)
+    return out
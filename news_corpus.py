@@ -0,0 +1,162 @@
+# news_corpus.py — общий корпус новостей процесса с индексом «монета → заголовки»
+# Каждый фид разбирается один раз: новые заголовки проходят один проход Ахо–Корасик по всем
+# известным именам / тикерам / id монет (coin_index, топ по капитализации), и попадают
+# в обратный индекс. Новости любой монеты — поиск в индексе, а не новая загрузка и не `q in text`.
+# Совпадение — только по границам слов: «ETH» не найдётся в «method».
+
+import time, threading
+from collections import OrderedDict
+import coin_index
+
+MAX_ITEMS = 3000        # заголовков в корпусе; старые вытесняются вместе с записями индекса
+PATTERN_MAX_RANK = 1000 # шаблоны — монеты из топа капитализации (остальные ищутся подстрокой)
+MIN_SYMBOL_LEN = 3      # тикеры короче — слишком часто слова («op», «ar»)
+# тикеры / имена, совпадающие с обычными словами заголовков
+STOP = frozenset("""the and for one all new now can get pay key hot gas via ray act win max sun ace ark dog
+cat ton sol just open pump fun real ever safe moon big top bit any who why how out not are was has
+its you our day per usd eur ai""".split())
+
+class Automaton:
+    """
+    Ахо–Корасик: find(text) → множество значений шаблонов, встреченных целыми словами.
+    Из пересекающихся совпадений берётся самое левое и длинное: «Bitcoin Cash» — это bitcoin-cash, а не ещё и bitcoin.
+    """
+    def __init__(self, patterns):
+        self.goto, self.fail, self.out = [{}], [0], [[]]
+        for p, v in patterns.items():
+            s = 0
+            for ch in p:
+                nxt = self.goto[s].get(ch)
+                if nxt is None:
+                    nxt = self.goto[s][ch] = len(self.goto)
+                    self.goto.append({}); self.fail.append(0); self.out.append([])
+                s = nxt
+            self.out[s].append((len(p), v))
+        queue = list(self.goto[0].values())
+        for s in queue:
+            for ch, nxt in self.goto[s].items():
+                f = self.fail[s]
+                while f and ch not in self.goto[f]: f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+                queue.append(nxt)
+        self.size = len(self.goto)
+
+    def find(self, text):
+        hits, s, goto, fail, out = [], 0, self.goto, self.fail, self.out
+        n = len(text)
+        for i, ch in enumerate(text):
+            while s and ch not in goto[s]: s = fail[s]
+            s = goto[s].get(ch, 0)
+            for L, v in out[s]:
+                a = i - L + 1
+                if (a == 0 or not text[a-1].isalnum()) and (i+1 == n or not text[i+1].isalnum()):
+                    hits.append((a, -L, v))
+        # самое левое, при равном начале — самое длинное; совпадения внутри взятого пропускаются
+        found, end = set(), 0
+        for a, negL, v in sorted(hits):
+            if a >= end: found.add(v); end = a - negL
+        return found
+
+_lock = threading.Lock()
+_items = OrderedDict()  # id -> {"src", "title", "summary", "coins", "ts"}
+_order = {}             # источник -> [id] в порядке последнего снимка фида (свежие первыми)
+_index = {}             # id монеты -> set(id заголовков)
+_extra = {}             # шаблоны от приложений (популярные монеты) — до готовности coin_index
+_auto = None
+_auto_key = None        # (built_at индекса монет, число доп. шаблонов) — когда пересобрать автомат
+_stats = {"ingested": 0, "seen": 0, "lookups": 0, "fallback": 0}
+
+def add_patterns(mapping):
+    """Доп. шаблоны {имя/тикер: id монеты}, например POPULAR_COINS приложения."""
+    global _auto_key
+    new = {k.lower(): v for k, v in mapping.items()}
+    with _lock:
+        if any(_extra.get(k) != v for k, v in new.items()):   # повторный прогон скрипта — без пересборки
+            _extra.update(new); _auto_key = None
+
+def _patterns():
+    pats = coin_index.patterns(max_rank=PATTERN_MAX_RANK, min_len=MIN_SYMBOL_LEN)
+    pats = {k: v for k, v in pats.items() if k not in STOP}
+    pats.update(_extra)
+    return pats
+
+def _automaton():
+    # вызывать под _lock; при смене индекса монет — пересборка и перематчинг корпуса
+    global _auto, _auto_key
+    key = (coin_index.built_at(), len(_extra))
+    if _auto is None or key != _auto_key:
+        _auto, _auto_key = Automaton(_patterns()), key
+        _index.clear()
+        for iid, it in _items.items():
+            it["coins"] = _auto.find(f"{it['title']} {it['summary']}".lower())
+            for c in it["coins"]: _index.setdefault(c, set()).add(iid)
+    return _auto
+
+def ingest(src, entries):
+    """
+    Снимок фида src: список (заголовок, анонс) — уже без HTML, свежие первыми.
+    Сопоставляются с монетами только новые заголовки. Возвращает, сколько новых.
+    """
+    now = time.time(); new = 0; ids = []
+    with _lock:
+        auto = _automaton()
+        for title, summary in entries:
+            iid = f"{src}\x00{title}"
+            ids.append(iid)
+            if iid in _items:
+                _stats["seen"] += 1; continue
+            coins = auto.find(f"{title} {summary}".lower())
+            _items[iid] = {"src": src, "title": title, "summary": summary, "coins": coins, "ts": now}
+            for c in coins: _index.setdefault(c, set()).add(iid)
+            new += 1
+        _stats["ingested"] += new
+        keep = dict.fromkeys(ids)
+        _order[src] = list(keep) + [i for i in _order.get(src, ()) if i not in keep]
+        while len(_items) > MAX_ITEMS:
+            iid, it = _items.popitem(last=False)
+            for c in it["coins"]: _index.get(c, set()).discard(iid)
+            lst = _order.get(it["src"])
+            if lst and iid in lst: lst.remove(iid)
+    return new
+
+def coins_for(query):
+    """
+    id монет запроса: монета, которую нашёл coin_index, — только она; иначе шаблоны, встреченные
+    в самом запросе («BTC price» → bitcoin). «Bitcoin Cash» не тянет за собой bitcoin.
+    """
+    q = (query or "").strip()
+    cid = coin_index.resolve(q)
+    if cid: return {cid}
+    with _lock:
+        return _automaton().find(q.lower())
+
+def _row(iid):
+    it = _items[iid]
+    return it["src"], it["title"], it["summary"]
+
+def recent(src, n=None):
+    """Последние заголовки источника: [(src, title, summary)], свежие первыми."""
+    with _lock:
+        return [_row(i) for i in _order.get(src, ())[:n]]
+
+def lookup(query, src=None, n=None):
+    """
+    Заголовки про монету запроса (по индексу), по источникам — в порядке фида: [(src, title, summary)].
+    Монета вне шаблонов (мелкая, свежая) — поиск подстрокой по корпусу.
+    """
+    cids = coins_for(query); ql = (query or "").lower().strip()
+    with _lock:
+        _stats["lookups"] += 1
+        hit = set().union(*(_index.get(c, ()) for c in cids)) if cids else set()
+        if not hit and ql:
+            _stats["fallback"] += 1
+            hit = {i for i, it in _items.items() if ql in f"{it['title']} {it['summary']}".lower()}
+        srcs = [src] if src else list(_order)
+        out = [_row(i) for s in srcs for i in _order.get(s, ()) if i in hit]
+    return out[:n]
+
+def stats():
+    with _lock:
+        return dict(_stats, items=len(_items), coins=len(_index), sources=len(_order),
+                    automaton_nodes=_auto.size if _auto else 0)
@@ -0,0 +1,65 @@
+# news_engine.py — параллельная сборка новостей
+# Все источники опрашиваются одновременно, общий дедлайн на всю сборку,
+# частичный результат от тех, кто успел, + отчёт по задержке/ошибкам каждого источника.
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import perf_trace
+
+NEWS_DEADLINE = 8.0  # сек от старта источников (стартуют вместе — это лимит всей сборки)
+
+# Свой пул на каждый вызов (поток на источник): сборки параллельных анализов не стоят в общей
+# очереди. Медленный источник не блокирует выход из fetch_all — его поток досчитает в фоне,
+# а результат будет отброшен. Дедлайн источника отсчитывается от старта его задачи, не от постановки.
+
+def _timed(name, fn, started):
+    t0 = started[name] = time.perf_counter()
+    try:
+        with perf_trace.span("news_source", src=name) as sp:
+            res = fn(); sp["count"] = len(res)
+        return res, None, time.perf_counter() - t0
+    except Exception as e:
+        return [], f"{type(e).__name__}: {e}", time.perf_counter() - t0
+
+def fetch_all(sources, deadline=NEWS_DEADLINE):
+    """
+    Параллельный опрос источников новостей.
+    sources  — список пар (имя, функция без аргументов → список новостей);
+               функция может бросать исключение — это попадёт в отчёт.
+    deadline — лимит, сек, от старта задачи источника (стартуют все сразу — это и лимит всей сборки).
+    Возвращает (items, report):
+      items  — новости в порядке sources (только от успевших источников),
+      report — по строке на источник: src, ok, ms, count, error.
+    """
+    started = {}
+    pool = ThreadPoolExecutor(max_workers=max(1, len(sources)), thread_name_prefix="news")
+    futs = [(name, pool.submit(perf_trace.bind(_timed), name, fn, started)) for name, fn in sources]
+    pool.shutdown(wait=False)
+    while True:
+        now = time.perf_counter()
+        # у ещё не стартовавшей задачи дедлайн не идёт: проверяем её снова через 50 мс
+        ends = [started[name] + deadline if name in started else now + 0.05 for name, f in futs if not f.done()]
+        live = [e for e in ends if e > now]
+        if not live: break   # все готовы или вышли за свой дедлайн
+        wait([f for _, f in futs if not f.done()], timeout=min(live) - now, return_when=FIRST_COMPLETED)
+
+    items, report = [], []
+    for name, f in futs:
+        if not f.done():
+            report.append({"src": name, "ok": False, "ms": round((time.perf_counter()-started[name])*1000),
+                           "count": 0, "error": f"timeout > {deadline:g}s"})
+            continue
+        res, err, dt = f.result()
+        items += res
+        report.append({"src": name, "ok": err is None, "ms": round(dt*1000), "count": len(res), "error": err})
+    return items, report
+
+def format_report(report):
+    """Короткие строки для UI: «GoogleNews — 412 мс, 15 шт.» / «CoinDesk — ✖ timeout > 8s»."""
+    lines = []
+    for r in report:
+        if r["ok"]:
+            lines.append(f"{r['src']} — {r['ms']} мс, {r['count']} шт.")
+        else:
+            lines.append(f"{r['src']} — ✖ {r['error']} ({r['ms']} мс)")
+    return lines
@@ -0,0 +1,168 @@
+# perf_trace.py — замеры по стадиям: спаны, HTTP-запросы, попадания в кэши
+# Трасса живёт в contextvars — своя у каждого прогона скрипта (сессии Streamlit идут в разных потоках).
+# Задачи, уходящие в пулы потоков, оборачиваются bind(fn), чтобы их спаны попали в ту же трассу.
+# Параллельно копятся агрегаты процесса — их отдаёт prometheus_text() для мониторинга.
+#   with span("news"): ...                 — стадия
+#   t0 = time.perf_counter(); ...; record("cards", t0)   — то же без лишнего отступа у длинного блока
+#   http_event(...), cache_event(...)      — пишут модули http_client / feed_cache / price_service / ...
+#   queue_event(...), gauge(...)           — очередь планировщика http_client: ожидание токена, глубина
+#   CRYPTO_BOT_TRACE_FILE=trace.jsonl      — каждая законченная трасса дописывается JSON-строками
+
+import os, json, time, threading, contextvars
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+TRACE_FILE = os.environ.get("CRYPTO_BOT_TRACE_FILE")
+MAX_EVENTS = 2000   # на трассу: длинный прогон не раздувает память
+
+_current = contextvars.ContextVar("perf_trace", default=None)
+_parent = contextvars.ContextVar("perf_span", default=None)
+_agg_lock = threading.Lock()
+_agg = {"span": {}, "http": {}, "http_bytes": {}, "cache": {}, "queue": {}, "gauge": {}}   # ключ-кортеж -> [count, sum_ms] / число
+
+class Trace:
+    def __init__(self, label):
+        self.label, self.started = label, time.time()
+        self.t0 = time.perf_counter()
+        self.spans, self.http, self.cache = [], [], {}
+        self._lock = threading.Lock()
+
+    def _add(self, lst, rec):
+        with self._lock:
+            if len(lst) < MAX_EVENTS: lst.append(rec)
+
+    def summary(self):
+        with self._lock:
+            return {"label": self.label, "ts": round(self.started, 3),
+                    "total_ms": round((time.perf_counter()-self.t0)*1000, 1),
+                    "spans": list(self.spans), "http": list(self.http),
+                    "cache": {k: dict(v) for k, v in self.cache.items()}}
+
+def begin(label):
+    """Новая трасса для текущего прогона (контекста)."""
+    tr = Trace(label); _current.set(tr); _parent.set(None)
+    return tr
+
+def current():
+    return _current.get()
+
+def bind(fn):
+    """fn, который в другом потоке пишет в трассу вызывающего. Копия контекста — на каждый вызов bind."""
+    ctx = contextvars.copy_context()
+    return lambda *a, **k: ctx.run(fn, *a, **k)
+
+@contextmanager
+def span(name, **attrs):
+    """Замер стадии; attrs можно дополнять внутри блока (yield отдаёт словарь)."""
+    tr = _current.get(); parent = _parent.get()
+    token = _parent.set(name)
+    t0 = time.perf_counter(); rec = dict(attrs); err = None
+    try:
+        yield rec
+    except Exception as e:
+        err = f"{type(e).__name__}: {e}"; raise
+    finally:
+        _parent.reset(token)
+        _record(tr, name, parent, t0, {**rec, **({"error": err} if err else {})})
+
+def record(name, t0, **attrs):
+    """Спан, начатый в t0 (time.perf_counter()) и закончившийся сейчас."""
+    _record(_current.get(), name, _parent.get(), t0, attrs)
+
+def _record(tr, name, parent, t0, attrs):
+    ms = (time.perf_counter() - t0)*1000
+    with _agg_lock:
+        a = _agg["span"].setdefault((name,), [0, 0.0]); a[0] += 1; a[1] += ms
+    if tr is not None:
+        tr._add(tr.spans, {"span": name, "parent": parent, "start_ms": round((t0-tr.t0)*1000, 1),
+                           "ms": round(ms, 1), **attrs})
+
+def http_event(endpoint, url, status, nbytes, ms, error=None, wait_ms=0.0):
+    host = urlsplit(url).hostname or ""
+    with _agg_lock:
+        a = _agg["http"].setdefault((endpoint or "other", str(status)), [0, 0.0]); a[0] += 1; a[1] += ms
+        _agg["http_bytes"][(endpoint or "other",)] = _agg["http_bytes"].get((endpoint or "other",), 0) + nbytes
+    tr = _current.get()
+    if tr is not None:
+        tr._add(tr.http, {"endpoint": endpoint, "host": host, "status": status, "bytes": nbytes,
+                          "ms": round(ms, 1), "span": _parent.get(), **({"wait_ms": round(wait_ms, 1)} if wait_ms >= 1 else {}),
+                          **({"error": error} if error else {})})
+
+def queue_event(host, priority, wait_ms):
+    """Запрос получил токен хоста после wait_ms в очереди (priority — interactive / background)."""
+    with _agg_lock:
+        a = _agg["queue"].setdefault((host, priority), [0, 0.0]); a[0] += 1; a[1] += wait_ms
+
+def gauge(name, host, value):
+    with _agg_lock:
+        _agg["gauge"][(name, host)] = value
+
+def cache_event(region, hit, n=1):
+    """Попадание/промах кэша region (rss, translate, price, history, ...); n — сразу на несколько ключей."""
+    if n <= 0: return
+    k = "hit" if hit else "miss"
+    with _agg_lock:
+        _agg["cache"][(region, k)] = _agg["cache"].get((region, k), 0) + n
+    tr = _current.get()
+    if tr is not None:
+        with tr._lock:
+            c = tr.cache.setdefault(region, {"hit": 0, "miss": 0}); c[k] += n
+
+def finish(tr=None):
+    """Закрыть трассу: сводка; при CRYPTO_BOT_TRACE_FILE — дописать её в файл."""
+    tr = tr or _current.get()
+    if tr is None: return None
+    s = tr.summary()
+    if TRACE_FILE:
+        try:
+            with open(TRACE_FILE, "a", encoding="utf-8") as f: f.write(to_jsonl(s))
+        except OSError:
+            pass
+    return s
+
+# ========= Экспорт =========
+def to_jsonl(summary):
+    """Трасса → JSON-строки: по строке на спан / HTTP-запрос / регион кэша."""
+    base = {"trace": summary["label"], "ts": summary["ts"]}
+    rows = [{**base, "kind": "span", **s} for s in summary["spans"]]
+    rows += [{**base, "kind": "http", **h} for h in summary["http"]]
+    rows += [{**base, "kind": "cache", "region": r, **c} for r, c in summary["cache"].items()]
+    rows.append({**base, "kind": "total", "ms": summary["total_ms"]})
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows)
+
+def _label_value(v):
+    # формат Prometheus: в значении метки экранируются \, " и перевод строки
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**kv):
+    return ",".join(f'{k}="{_label_value(v)}"' for k, v in kv.items())
+
+def prometheus_text():
+    """Агрегаты процесса в текстовом формате Prometheus."""
+    with _agg_lock:
+        spans, http = dict(_agg["span"]), dict(_agg["http"])
+        nbytes, cache = dict(_agg["http_bytes"]), dict(_agg["cache"])
+        queue, gauges = dict(_agg["queue"]), dict(_agg["gauge"])
+    out = ["# HELP crypto_bot_stage_seconds Время стадий анализа/сканера.", "# TYPE crypto_bot_stage_seconds summary"]
+    for (name,), (n, ms) in sorted(spans.items()):
+        out.append(f"crypto_bot_stage_seconds_count{{{_labels(stage=name)}}} {n}")
+        out.append(f"crypto_bot_stage_seconds_sum{{{_labels(stage=name)}}} {ms/1000:.6f}")
+    out += ["# HELP crypto_bot_http_seconds HTTP-запросы по эндпоинту и статусу.", "# TYPE crypto_bot_http_seconds summary"]
+    for (ep, st), (n, ms) in sorted(http.items()):
+        out.append(f"crypto_bot_http_seconds_count{{{_labels(endpoint=ep, status=st)}}} {n}")
+        out.append(f"crypto_bot_http_seconds_sum{{{_labels(endpoint=ep, status=st)}}} {ms/1000:.6f}")
+    out += ["# HELP crypto_bot_http_bytes_total Байт тела ответов.", "# TYPE crypto_bot_http_bytes_total counter"]
+    for (ep,), b in sorted(nbytes.items()):
+        out.append(f"crypto_bot_http_bytes_total{{{_labels(endpoint=ep)}}} {b}")
+    out += ["# HELP crypto_bot_cache_total Попадания/промахи кэшей.", "# TYPE crypto_bot_cache_total counter"]
+    for (region, k), n in sorted(cache.items()):
+        out.append(f"crypto_bot_cache_total{{{_labels(region=region, result=k)}}} {n}")
+    out += ["# HELP crypto_bot_http_queue_wait_seconds Ожидание токена в очереди хоста.",
+            "# TYPE crypto_bot_http_queue_wait_seconds summary"]
+    for (host, prio), (n, ms) in sorted(queue.items()):
+        out.append(f"crypto_bot_http_queue_wait_seconds_count{{{_labels(host=host, priority=prio)}}} {n}")
+        out.append(f"crypto_bot_http_queue_wait_seconds_sum{{{_labels(host=host, priority=prio)}}} {ms/1000:.6f}")
+    out += ["# HELP crypto_bot_http_queue_depth Запросов в очереди хоста сейчас.", "# TYPE crypto_bot_http_queue_depth gauge"]
+    for (name, host), v in sorted(gauges.items()):
+        if name == "http_queue_depth": out.append(f"crypto_bot_http_queue_depth{{{_labels(host=host)}}} {v}")
+    return "\n".join(out) + "\n"
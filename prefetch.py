@@ -0,0 +1,91 @@
+# prefetch.py — фоновое обновление горячих данных процесса
+# Ленты Pump.fun, цены популярных монет, общие RSS-фиды обновляются своими потоками по расписанию,
+# а прогоны пользователей читают готовый снимок (get) и не ждут сеть.
+# Интервалы (сек) — по умолчанию из INTERVALS, переопределяются окружением:
+#   CRYPTO_BOT_PREFETCH="pump_created=10,pump_trending=30,prices=45,rss=90"   (0 — задача выключена)
+#   CRYPTO_BOT_PREFETCH_OFF=1                                                 — весь планировщик выключен
+
+import os, time, threading
+import perf_trace, http_client
+
+INTERVALS = {"pump_created": 15, "pump_trending": 30, "prices": 45, "rss": 60}
+ENABLED = os.environ.get("CRYPTO_BOT_PREFETCH_OFF", "") not in ("1", "true", "yes")
+
+def _env_intervals():
+    out = {}
+    for part in os.environ.get("CRYPTO_BOT_PREFETCH", "").split(","):
+        name, _, sec = part.partition("=")
+        try: out[name.strip()] = float(sec)
+        except ValueError: pass
+    return out
+
+_overrides = _env_intervals()
+_lock = threading.Lock()
+_jobs = {}    # имя -> {"fn", "interval", "thread", "snap"}
+
+def interval(name):
+    return _overrides.get(name, INTERVALS.get(name, 60))
+
+def _run(name):
+    job = _jobs[name]
+    while True:
+        t0 = time.perf_counter()
+        perf_trace.begin(f"prefetch:{name}")
+        try:
+            with http_client.background():   # в очереди хостов — после запросов пользователей
+                value, err = job["fn"](), None
+        except Exception as e:
+            value, err = None, f"{type(e).__name__}: {e}"
+        perf_trace.finish()
+        ms = round((time.perf_counter()-t0)*1000)
+        with _lock:
+            s = job["snap"]; s["runs"] += 1; s["ms"] = ms; s["checked_at"] = time.time()
+            if err is None:
+                s.update(value=value, ts=time.time(), ok=True, error=None)
+            else:
+                s.update(ok=False, error=err); s["fails"] += 1   # прежний снимок остаётся
+        time.sleep(max(1.0, job["interval"]))
+
+def register(name, fn, every=None):
+    """
+    Задача fn() → снимок, раз в every сек (по умолчанию interval(name)). Поток стартует при первой
+    регистрации; повторная регистрация (следующий прогон скрипта) только обновляет fn.
+    """
+    every = interval(name) if every is None else every
+    if not ENABLED or every <= 0: return False
+    with _lock:
+        job = _jobs.get(name)
+        if job is not None:
+            job["fn"] = fn; return True
+        _jobs[name] = {"fn": fn, "interval": every,
+                       "snap": {"value": None, "ts": 0.0, "ok": None, "error": None, "ms": None,
+                                "runs": 0, "fails": 0, "checked_at": 0.0}}
+    threading.Thread(target=_run, args=(name,), daemon=True, name=f"prefetch-{name}").start()
+    return True
+
+def get(name, max_age=None):
+    """Значение последнего удачного снимка или None (нет задачи / ещё не было / старше max_age). Не блокирует."""
+    with _lock:
+        job = _jobs.get(name)
+        if job is None or not job["snap"]["ts"]: return None
+        s = job["snap"]
+        if max_age is not None and time.time() - s["ts"] > max_age: return None
+        return s["value"]
+
+def age(name):
+    """Сек с последнего удачного снимка (None — снимка нет)."""
+    with _lock:
+        job = _jobs.get(name)
+        return round(time.time() - job["snap"]["ts"], 1) if job and job["snap"]["ts"] else None
+
+def status():
+    """Строка на задачу: интервал, возраст снимка, последний прогон, ошибки — для UI."""
+    now = time.time(); rows = []
+    with _lock:
+        for name, job in _jobs.items():
+            s = job["snap"]
+            rows.append({"job": name, "every_s": job["interval"],
+                         "age_s": round(now - s["ts"], 1) if s["ts"] else None,
+                         "stale": not s["ts"] or now - s["ts"] > 2*job["interval"],
+                         "last_ms": s["ms"], "runs": s["runs"], "fails": s["fails"], "error": s["error"]})
+    return rows
@@ -0,0 +1,90 @@
+# price_service.py — цены CoinGecko пачками
+# Запрошенные id копятся WINDOW секунд и уходят одним /simple/price?ids=a,b,c.
+# Общий кэш по id на процесс; каждый ждущий вызов получает свой результат из той же пачки.
+
+import time, threading
+import http_client, perf_trace
+
+COINGECKO_URL = "https://api.coingecko.com/api/v3"
+WINDOW = 0.05         # сек сбора пачки
+TTL = 60              # сек жизни цены (как у прежнего st.cache_data)
+MISS_TTL = 15         # «монета без цены» помним меньше
+MAX_IDS = 200         # id в одном запросе (длина URL)
+WAIT = 12             # сек ожидания пачки вызывающим
+
+_lock = threading.Lock()
+_cache = {}           # id -> (цена | None, ts)
+_inflight = {}        # id -> Event, пока id в пути
+_queue = []           # id, ждущие отправки
+_leader = False       # кто-то уже собирает пачку
+_stats = {"requests": 0, "ids": 0, "hit": 0}
+
+def _fresh(cid, now):
+    v = _cache.get(cid)
+    return v is not None and now - v[1] < (TTL if v[0] is not None else MISS_TTL)
+
+def _send(ids, base_url):
+    res = {}
+    for i in range(0, len(ids), MAX_IDS):
+        chunk = ids[i:i+MAX_IDS]
+        try:
+            r = http_client.get(f"{base_url}/simple/price", endpoint="coingecko",
+                                params={"ids": ",".join(chunk), "vs_currencies": "usd"})
+            data = r.json() if r.status_code == 200 else None
+        except Exception:
+            data = None
+        with _lock:
+            _stats["requests"] += 1; _stats["ids"] += len(chunk)
+        if data is None: continue  # сбой — не кэшируем, следующий вызов повторит
+        for cid in chunk: res[cid] = (data.get(cid) or {}).get("usd")
+    return res
+
+def _flush(base_url):
+    global _leader
+    time.sleep(WINDOW)
+    with _lock:
+        batch = list(dict.fromkeys(_queue)); _queue.clear(); _leader = False
+    res = _send(batch, base_url)
+    now = time.time()
+    with _lock:
+        for cid in batch:
+            if cid in res: _cache[cid] = (res[cid], now)
+            ev = _inflight.pop(cid, None)
+            if ev: ev.set()
+
+def get_prices(ids, base_url=COINGECKO_URL):
+    """{id: цена USD | None} для всех ids; свежие — из кэша, остальные — одной пачкой с соседями."""
+    global _leader
+    ids = [str(i).strip().lower() for i in ids if str(i).strip()]
+    now = time.time(); waits = []; lead = False; hits = 0
+    with _lock:
+        for cid in dict.fromkeys(ids):
+            if _fresh(cid, now): _stats["hit"] += 1; hits += 1; continue
+            ev = _inflight.get(cid)
+            if ev is None:
+                ev = _inflight[cid] = threading.Event(); _queue.append(cid)
+            waits.append(ev)
+        if _queue and not _leader:
+            _leader = lead = True
+    perf_trace.cache_event("price", True, hits); perf_trace.cache_event("price", False, len(waits))
+    if lead:
+        _flush(base_url)  # собирает пачку сам вызывающий — без отдельного потока
+    for ev in waits: ev.wait(WAIT)
+    with _lock:
+        return {cid: (_cache.get(cid) or (None, 0))[0] for cid in ids}
+
+def get_price(cid, also=(), base_url=COINGECKO_URL):
+    """Цена одной монеты; also — id, которые стоит обновить той же пачкой (популярные и т.п.)."""
+    cid = str(cid).strip().lower()
+    return get_prices([cid, *also], base_url)[cid]
+
+def invalidate(ids=None):
+    """Забыть цены ids (None — все); монеты в пути дождутся своей пачки как обычно."""
+    with _lock:
+        if ids is None: _cache.clear()
+        else:
+            for cid in ([ids] if isinstance(ids, str) else ids): _cache.pop(str(cid).strip().lower(), None)
+
+def stats():
+    with _lock:
+        return dict(_stats, cached=len(_cache))
@@ -0,0 +1,100 @@
+# price_store.py — локальная история цен CoinGecko (SQLite)
+# Первый запрос по монете — полная загрузка market_chart (с прежней цепочкой фолбэков).
+# Дальше с сети докачиваются только свечи после последней сохранённой, чтение — с диска.
+# История копится: со временем хватает и на более длинные окна.
+
+import os, math, time, sqlite3, threading
+import pandas as pd
+import http_client, disk_store, perf_trace
+
+COINGECKO_URL = "https://api.coingecko.com/api/v3"
+DB_FILE = "prices.sqlite"
+TOPUP_EVERY = 300      # сек: чаще в сеть за монетой не ходим, отдаём с диска
+HOUR_MS = 3600*1000
+
+_locks = {}
+_locks_guard = threading.Lock()
+_schema_ready = False
+
+def _coin_lock(coin):
+    with _locks_guard:
+        return _locks.setdefault(coin, threading.Lock())
+
+def _connect():
+    global _schema_ready
+    os.makedirs(disk_store.CACHE_DIR, exist_ok=True)
+    con = sqlite3.connect(disk_store.path(DB_FILE), timeout=10)
+    if not _schema_ready:
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("CREATE TABLE IF NOT EXISTS prices (coin TEXT, ts INTEGER, price REAL, PRIMARY KEY (coin, ts))")
+        con.execute("CREATE TABLE IF NOT EXISTS meta (coin TEXT PRIMARY KEY, fetched_at REAL)")
+        con.commit(); _schema_ready = True
+    return con
+
+def _fetch(coin, params, base_url):
+    # каждый шаг цепочки фолбэков — отдельный спан: видно, сколько попыток ушло и на что
+    with perf_trace.span("market_chart", days=params["days"], interval=params["interval"]) as sp:
+        r = http_client.get(f"{base_url}/coins/{coin}/market_chart", params=params, endpoint="coingecko")
+        sp["status"] = r.status_code
+        if r.status_code != 200: return []
+        pts = [(int(ts), float(p)) for ts, p in (r.json().get("prices") or []) if p is not None]
+        sp["points"] = len(pts)
+        return pts
+
+def _full_load(coin, days, interval, base_url):
+    # прежняя цепочка: полное окно → 3д → 1д → дневные свечи
+    for params in (
+        {"vs_currency":"usd","days":days,"interval":interval},
+        {"vs_currency":"usd","days":3,"interval":interval},
+        {"vs_currency":"usd","days":1,"interval":interval},
+        {"vs_currency":"usd","days":days,"interval":"daily"},
+    ):
+        pts = _fetch(coin, params, base_url)
+        if pts: return pts
+    return []
+
+def _top_up(coin, last_ts, days, interval, base_url):
+    # запрашиваем минимальное окно, покрывающее разрыв с последней свечой
+    gap_days = (time.time()*1000 - last_ts) / (24*HOUR_MS)
+    span = max(1, min(int(days), math.ceil(gap_days)))
+    return _fetch(coin, {"vs_currency":"usd","days":span,"interval":interval}, base_url)
+
+def _read(con, coin, days, interval):
+    since = int(time.time()*1000 - days*24*HOUR_MS)
+    rows = con.execute("SELECT ts, price FROM prices WHERE coin=? AND ts>=? ORDER BY ts", (coin, since)).fetchall()
+    if not rows: return pd.DataFrame(columns=["date","price"])
+    df = pd.DataFrame(rows, columns=["ts","price"]); df["date"] = pd.to_datetime(df["ts"], unit="ms")
+    if interval == "hourly":
+        # догрузки за 1 день приходят 5-минутками — держим почасовую сетку, как у полного окна
+        df = df.set_index("date")["price"].resample("1h").last().dropna().reset_index()
+    return df[["date","price"]]
+
+def series(coin, days=7, interval="hourly", base_url=COINGECKO_URL):
+    """История цены coin (id CoinGecko) за days дней → DataFrame[date, price]."""
+    coin = str(coin).strip().lower()
+    with _coin_lock(coin):
+        con = _connect()
+        try:
+            last, = con.execute("SELECT MAX(ts) FROM prices WHERE coin=?", (coin,)).fetchone()
+            row = con.execute("SELECT fetched_at FROM meta WHERE coin=?", (coin,)).fetchone()
+            fetched_at = row[0] if row else 0.0
+            # fetched_at пишется и при пустом ответе: неизвестная / снятая с торгов монета не гоняет
+            # цепочку market_chart на каждый вызов — отрицательный результат живёт те же TOPUP_EVERY
+            stale = time.time() - fetched_at >= TOPUP_EVERY
+            perf_trace.cache_event("history", not stale)
+            if stale:
+                try:
+                    pts = _full_load(coin, days, interval, base_url) if last is None else _top_up(coin, last, days, interval, base_url)
+                except http_client.Throttled:
+                    if last is None: raise   # истории нет вовсе: пусть вызывающий видит «throttled», а не пустой ряд
+                    pts = None
+                except Exception:
+                    pts = None  # сеть недоступна — отдаём то, что есть на диске, и пробуем снова в следующий раз
+                if pts:
+                    con.executemany("INSERT OR REPLACE INTO prices (coin, ts, price) VALUES (?,?,?)", [(coin, t, p) for t, p in pts])
+                if pts is not None:
+                    con.execute("INSERT OR REPLACE INTO meta (coin, fetched_at) VALUES (?,?)", (coin, time.time()))
+                    con.commit()
+            return _read(con, coin, days, interval)
+        finally:
+            con.close()
@@ -0,0 +1,304 @@
+# pump_engine.py — загрузка, нормализация и скоринг токенов Pump.fun
+# Страницы ленты запрашиваются параллельно под общим дедлайном, дубли по mint между страницами убираются.
+# TokenTable — скользящая таблица токенов в памяти процесса: догружает только новое с начала ленты.
+# Построчные meme_score / meme_signal — эталон; add_signals считает то же самое
+# колонками для всей таблицы сразу (результат совпадает бит-в-бит, см. benchmarks/bench_pump.py).
+
+import os, time, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+import numpy as np
+import pandas as pd
+import http_client, perf_trace
+
+# Неофициальный фронтовой API, общедоступный:
+#   /coins/created?offset={offset}&limit={limit}
+#   /coins/trending?offset={offset}&limit={limit}
+PUMPFUN_API = "https://frontend-api.pump.fun"
+PAGE_DEADLINE = 15.0   # сек на все страницы сразу
+TABLE_CAP = int(os.environ.get("PUMP_TABLE_CAP", "5000"))  # сколько токенов держит TokenTable
+CATCHUP_PAGES = 5      # максимум страниц догрузки за одно обновление
+METRICS_TTL = 300.0    # сек: 5-минутные метрики строки старше — «устарели» (stale), в сортировку по активности не идут
+REFRESH_PAGES = 2      # страниц за обновление, которыми по кругу перечитываются уже известные токены
+
+SIGNAL_COLS = ["side", "atrp", "tp1", "tp2", "sl", "tp1p", "tp2p", "slp"]
+
+def mint_of(item: dict):
+    return item.get("mint") or item.get("address") or item.get("token_address") or ""
+
+def fetch_page(kind, offset=0, limit=50, headers=None):
+    """Одна страница ленты kind ("created" | "trending") → (список, info)."""
+    t0 = time.perf_counter()
+    r = http_client.get(f"{PUMPFUN_API}/coins/{kind}", params={"offset": offset, "limit": limit},
+                        headers=headers, endpoint="pumpfun")
+    ms = round((time.perf_counter()-t0)*1000)
+    if r.status_code != 200: return [], {"ok": False, "status": r.status_code, "url": r.url, "ms": ms}
+    data = r.json() or []
+    return data, {"ok": True, "status": 200, "url": r.url, "count": len(data), "ms": ms}
+
+def _safe_page(kind, offset, limit, headers):
+    with perf_trace.span("pump_page", kind=kind, offset=offset) as sp:
+        try:
+            data, info = fetch_page(kind, offset, limit, headers)
+        except Exception as e:
+            data, info = [], {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        sp["count"] = len(data)
+        return data, info
+
+def fetch_pages(kind, pages, limit=50, headers=None, deadline=PAGE_DEADLINE):
+    """
+    Все страницы сразу. Возвращает (items, diag):
+      items — сырые записи по порядку страниц, без повторов mint (токены сдвигаются между offset),
+      diag  — по строке на страницу: page, offset, ok, status, ms, count, dupes (+ url / error).
+    Не успевшие к дедлайну страницы помечаются ok=False, error="timeout".
+    """
+    # свой пул на вызов (поток на страницу): страницы не стоят в очереди за prefetch и другими
+    # сессиями, поэтому дедлайн от постановки = дедлайн от старта; опоздавшие досчитают в фоне
+    t0 = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=max(1, pages), thread_name_prefix="pump")
+    futs = [pool.submit(perf_trace.bind(_safe_page), kind, pg*limit, limit, headers) for pg in range(pages)]
+    pool.shutdown(wait=False)
+    wait(futs, timeout=max(0.0, deadline))
+    items, diag, seen = [], [], set()
+    for pg, f in enumerate(futs):
+        row = {"page": pg+1, "offset": pg*limit}
+        if not f.done():
+            row.update(ok=False, error=f"timeout > {deadline:g}s", ms=round((time.perf_counter()-t0)*1000), count=0)
+            diag.append(row); continue
+        chunk, info = f.result()
+        row.update(info); dupes = 0
+        for it in chunk:
+            m = mint_of(it)
+            if m and m in seen: dupes += 1; continue
+            if m: seen.add(m)
+            items.append(it)
+        row.update(count=len(chunk), dupes=dupes)
+        diag.append(row)
+    return items, diag
+
+def pump_norm(item: dict):
+    # Поля Pump.fun часто меняются; защищаемся дефолтами
+    symbol = (item.get("symbol") or item.get("token_symbol") or "").upper()
+    name   = item.get("name") or item.get("token_name") or symbol or "UNKNOWN"
+    addr   = mint_of(item)
+    price  = item.get("usd_market_cap")  # иногда приходит mc, иногда price — нормализуем
+    if price and price > 0 and item.get("supply"):
+        est_price = float(price)/float(item.get("supply"))
+    else:
+        est_price = float(item.get("price_usd") or item.get("usd_price") or 0.0)
+    created = item.get("created_timestamp") or item.get("createdAt") or item.get("created_at")
+    # активность (эвристики; у Pump.fun разные поля)
+    tx5m = item.get("txns_5m") or item.get("tx_5m") or item.get("txn_5m") or 0
+    vol5 = item.get("volume_5m") or item.get("vol_5m") or 0.0
+    liq  = item.get("liquidity_usd") or item.get("liquidity") or 0.0
+    mc   = item.get("usd_market_cap") or item.get("market_cap_usd") or 0.0
+    chg5 = item.get("price_change_5m") or item.get("chg_5m") or 0.0
+    return {
+        "name": name, "symbol": symbol, "address": addr, "price_usd": float(est_price or 0.0),
+        "liquidity_usd": float(liq or 0.0), "marketcap_usd": float(mc or 0.0),
+        "txns_5m": int(tx5m or 0), "volume_5m": float(vol5 or 0.0), "change_5m": float(chg5 or 0.0),
+        "created": created
+    }
+
+def meme_score(row):
+    liq = float(row.get("liquidity_usd", 0))
+    vol5 = float(row.get("volume_5m", 0))
+    tx5  = int(row.get("txns_5m", 0))
+    liq_score = min(100.0, liq/20000*100.0)
+    vol_score = min(100.0, vol5/5000*100.0)
+    tx_score  = min(100.0, tx5/50*100.0)
+    return round(0.25*liq_score + 0.35*vol_score + 0.40*tx_score, 1)
+
+def meme_signal(row):
+    price = row.get("price_usd", 0.0) or 0.0
+    chg5  = row.get("change_5m", 0.0) or 0.0
+    side  = "LONG" if chg5 >= 0 and row.get("txns_5m",0)>0 else ("SHORT" if chg5 < 0 else "HOLD")
+    # быстрая вола по активности/ликвидности
+    liq = max(1.0, row.get("liquidity_usd", 0.0))
+    vol5 = max(0.0, row.get("volume_5m", 0.0))
+    activity = max(0.0, min(1.0, row.get("txns_5m",0)/60.0))
+    base = (vol5/liq)*100.0
+    atrp = float(min(max(base*(1+0.7*activity), 0.4), 12.0))
+    if side == "HOLD" or price<=0:
+        return {"side":"HOLD","tp1":price,"tp2":price,"sl":price,"atrp":atrp}
+    sgn = 1 if side=="LONG" else -1
+    tp1p,tp2p,slp = atrp*0.6, atrp*1.2, max(atrp*0.5, 0.5)
+    return {
+        "side": side,
+        "tp1": price*(1+sgn*tp1p/100), "tp2": price*(1+sgn*tp2p/100),
+        "sl": price*(1-sgn*slp/100), "atrp": atrp,
+        "tp1p": tp1p, "tp2p": tp2p, "slp": slp
+    }
+
+# ---------- колоночные версии ----------
+# fmin/fmax вместо minimum/maximum: как и встроенные min/max, они не протаскивают NaN дальше.
+
+def _col(df, name):
+    if name in df: return df[name].to_numpy(dtype=float, na_value=np.nan)
+    return np.zeros(len(df))
+
+def _or0(a):
+    # аналог `x or 0.0`: обнуляется только 0, NaN (truthy) остаётся
+    return np.where(a == 0, 0.0, a)
+
+def meme_score_many(df: pd.DataFrame):
+    """meme_score для всех строк → np.ndarray."""
+    liq, vol5, tx5 = _col(df, "liquidity_usd"), _col(df, "volume_5m"), np.trunc(_col(df, "txns_5m"))
+    liq_score = np.fmin(100.0, liq/20000*100.0)
+    vol_score = np.fmin(100.0, vol5/5000*100.0)
+    tx_score  = np.fmin(100.0, tx5/50*100.0)
+    raw = 0.25*liq_score + 0.35*vol_score + 0.40*tx_score
+    # np.round округляет через ×10 и расходится с round() на ~0.1% значений — берём встроенный
+    return np.array([round(v, 1) for v in raw.tolist()], dtype=float)
+
+def meme_signal_many(df: pd.DataFrame):
+    """meme_signal для всех строк → dict колонок SIGNAL_COLS (tp1p/tp2p/slp = NaN у HOLD)."""
+    price = _or0(_col(df, "price_usd")); chg5 = _or0(_col(df, "change_5m")); tx = _col(df, "txns_5m")
+    side = np.where((chg5 >= 0) & (tx > 0), "LONG", np.where(chg5 < 0, "SHORT", "HOLD"))
+    liq = np.fmax(1.0, _col(df, "liquidity_usd"))
+    vol5 = np.fmax(0.0, _col(df, "volume_5m"))
+    activity = np.fmax(0.0, np.fmin(1.0, tx/60.0))
+    base = (vol5/liq)*100.0
+    atrp = np.fmin(np.fmax(base*(1+0.7*activity), 0.4), 12.0)
+
+    hold = (side == "HOLD") | (price <= 0)
+    side = np.where(hold, "HOLD", side)
+    sgn = np.where(side == "SHORT", -1.0, 1.0)
+    tp1p, tp2p, slp = atrp*0.6, atrp*1.2, np.fmax(atrp*0.5, 0.5)
+    nan = np.full(len(price), np.nan)
+    return {
+        "side": side, "atrp": atrp,
+        "tp1": np.where(hold, price, price*(1+sgn*tp1p/100)),
+        "tp2": np.where(hold, price, price*(1+sgn*tp2p/100)),
+        "sl":  np.where(hold, price, price*(1-sgn*slp/100)),
+        "tp1p": np.where(hold, nan, tp1p), "tp2p": np.where(hold, nan, tp2p), "slp": np.where(hold, nan, slp),
+    }
+
+def add_signals(df: pd.DataFrame):
+    """Копия df с колонками score + SIGNAL_COLS, посчитанными разом для всей таблицы."""
+    out = df.copy()
+    if out.empty:
+        for c in ["score"] + SIGNAL_COLS: out[c] = pd.Series(dtype=object if c == "side" else float)
+        return out
+    out["score"] = meme_score_many(out)
+    for c, v in meme_signal_many(out).items(): out[c] = v
+    return out
+
+def pl_columns(df: pd.DataFrame, margin, lev):
+    """P/L в USD при выходе по TP1/TP2/SL для позиции margin×lev по side каждой строки (HOLD → NaN)."""
+    price = _col(df, "price_usd"); notional = float(margin)*float(lev)
+    side = df["side"].to_numpy() if "side" in df else np.full(len(df), "HOLD")
+    sgn = np.where(side == "LONG", 1.0, np.where(side == "SHORT", -1.0, np.nan))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {f"pl_{c}": (_col(df, c) - price)/price*notional*sgn for c in ("tp1", "tp2", "sl")}
+
+# ---------- скользящая таблица ----------
+
+class TokenTable:
+    """
+    Токены ленты в памяти процесса, ключ — mint. Лента "created" отдаёт новые первыми,
+    поэтому обновление читает её с offset=0 до первого уже известного mint: в сеть уходят
+    только новые токены (обычно одна страница). Новые добавляются в конец, известные обновляются на месте,
+    не меняя порядка; сверх cap вытесняются самые старые.
+    Метрики за 5 минут (сделки, объём, ликвидность) у старых строк сами не обновятся: ещё REFRESH_PAGES
+    страниц за обновление перечитывают ленту дальше по кругу, а строки, не виденные дольше METRICS_TTL,
+    frame() помечает stale=True.
+    """
+    def __init__(self, kind="created", cap=TABLE_CAP, limit=50):
+        self.kind, self.cap, self.limit = kind, cap, limit
+        self._rows = OrderedDict()            # mint -> строка pump_norm; в конце — самые новые
+        self._lock = threading.Lock()         # данные таблицы
+        self._refresh_lock = threading.Lock() # одновременно обновляет только одна сессия
+        self.version = 0
+        self.updated_at = 0.0
+        self.last_diag = []
+        self._frame, self._frame_version = None, -1
+        self._cursor = 0                      # offset следующей страницы перечитывания известных токенов
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _merge(self, raw_items, known_only=False):
+        # raw_items — от новых к старым; вставляем с конца, чтобы новейшие оказались в хвосте
+        new = upd = evicted = 0; now = time.time()
+        with self._lock:
+            for it in reversed(raw_items):
+                row = pump_norm(it); m = row["address"]
+                if not m or (known_only and m not in self._rows): continue
+                row["seen_at"] = now   # когда метрики строки последний раз пришли из ленты
+                if m in self._rows: upd += 1   # известная строка обновляется на своём месте, порядок не трогаем
+                else: new += 1
+                self._rows[m] = row
+            while len(self._rows) > self.cap:
+                self._rows.popitem(last=False); evicted += 1
+            self.version += 1
+        return {"new": new, "updated": upd, "evicted": evicted}
+
+    def _catch_up(self, headers):
+        # страницы по очереди, пока не встретим уже известный mint
+        items, diag = [], []
+        for pg in range(CATCHUP_PAGES):
+            chunk, info = _safe_page(self.kind, pg*self.limit, self.limit, headers)
+            fresh = sum(1 for it in chunk if mint_of(it) not in self._rows)
+            diag.append({"page": pg+1, "offset": pg*self.limit, **info, "count": len(chunk), "fresh": fresh})
+            items += chunk
+            if not chunk or fresh < len(chunk): break
+        return items, diag
+
+    def _recheck(self, start, headers):
+        # известные токены глубже догрузки: REFRESH_PAGES страниц по кругу, с конца прошлого прохода
+        items, diag = [], []
+        if self._cursor < start or self._cursor >= len(self._rows): self._cursor = start
+        for _ in range(REFRESH_PAGES):
+            if self._cursor >= len(self._rows): break
+            chunk, info = _safe_page(self.kind, self._cursor, self.limit, headers)
+            diag.append({"page": "recheck", "offset": self._cursor, **info, "count": len(chunk)})
+            items += chunk; self._cursor += self.limit
+            if not chunk: break
+        return items, diag
+
+    def refresh(self, pages=1, headers=None, max_age=15.0, force=False):
+        """
+        Обновить таблицу, если она старше max_age сек (или force).
+        Пустая таблица заполняется pages страницами параллельно, дальше — только догрузка нового.
+        Возвращает diag последнего обновления.
+        """
+        with self._refresh_lock:
+            fresh = not force and self._rows and time.time() - self.updated_at < max_age
+            perf_trace.cache_event("pump_table", bool(fresh))
+            if fresh:
+                return self.last_diag
+            if self._rows:
+                items, diag = self._catch_up(headers)
+                old, diag2 = self._recheck(len(diag)*self.limit, headers)
+            else:
+                items, diag = fetch_pages(self.kind, pages, self.limit, headers)
+                old, diag2 = [], []
+            res = self._merge(items)
+            if old: res["rechecked"] = self._merge(old, known_only=True)["updated"]
+            if diag: diag[0].update(res)
+            diag += diag2
+            self.updated_at, self.last_diag = time.time(), diag
+            return diag
+
+    def frame(self):
+        """
+        DataFrame строк от новых к старым; пересобирается только после изменений.
+        stale — 5-минутные метрики строки старше METRICS_TTL (считается на каждый вызов).
+        """
+        with self._lock:
+            if self._frame_version != self.version:
+                self._frame = pd.DataFrame(list(reversed(self._rows.values())))
+                self._frame_version = self.version
+            f = self._frame
+        if f.empty: return f
+        return f.assign(stale=time.time() - f["seen_at"].to_numpy() > METRICS_TTL)
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+def token_table(kind="created"):
+    """Общая на процесс TokenTable для ленты kind."""
+    with _tables_lock:
+        if kind not in _tables: _tables[kind] = TokenTable(kind)
+        return _tables[kind]
@@ -0,0 +1,72 @@
+# sentiment.py — движок настроения (VADER) на процесс
+# Лексикон грузится один раз; compound-оценки кэшируются по хэшу текста,
+# поэтому повторные заголовки (между монетами и сессиями) не пересчитываются.
+
+import hashlib, threading
+from collections import OrderedDict
+import numpy as np
+from startup_timing import lazy_import
+import perf_trace
+
+MAX_ITEMS = 20000
+
+_lock = threading.Lock()
+_analyzer = None
+_cache = OrderedDict()   # sha1(text) -> compound
+_stats = {"hit": 0, "miss": 0}
+
+def analyzer():
+    """Единственный SentimentIntensityAnalyzer процесса."""
+    global _analyzer
+    if _analyzer is None:
+        with _lock:
+            if _analyzer is None:
+                vader = lazy_import("vaderSentiment.vaderSentiment")
+                _analyzer = vader.SentimentIntensityAnalyzer()
+    return _analyzer
+
+def _key(t):
+    return hashlib.sha1((t or "").encode("utf-8")).hexdigest()
+
+def score_many(texts):
+    """compound-оценка для каждого текста (список float той же длины)."""
+    keys = [_key(t) for t in texts]
+    out = [None]*len(texts); miss = []
+    with _lock:
+        for i, k in enumerate(keys):
+            v = _cache.get(k)
+            if v is None: miss.append(i)
+            else: out[i] = v; _cache.move_to_end(k)
+        _stats["hit"] += len(texts) - len(miss)
+    perf_trace.cache_event("sentiment", True, len(texts) - len(miss))
+    perf_trace.cache_event("sentiment", False, len(miss))
+    if miss:
+        a = analyzer(); fresh = {}
+        for i in miss:
+            k = keys[i]
+            if k not in fresh: fresh[k] = a.polarity_scores(texts[i])["compound"]
+            out[i] = fresh[k]
+        with _lock:
+            _stats["miss"] += len(fresh)
+            _cache.update(fresh)
+            while len(_cache) > MAX_ITEMS: _cache.popitem(last=False)
+    return out
+
+def sentiment_scores(texts):
+    """(средний compound, оценки по каждому тексту)."""
+    per = score_many(texts)
+    return (float(np.mean(per)) if per else 0.0), per
+
+def sentiment_score(texts):
+    return sentiment_scores(texts)[0]
+
+def top_drivers(titles, scores, k=3):
+    """k самых позитивных и k самых негативных заголовков: ([(оценка, заголовок)], [...])."""
+    pairs = sorted(zip(scores, titles), key=lambda x: x[0])
+    pos = [p for p in reversed(pairs) if p[0] > 0][:k]
+    neg = [p for p in pairs if p[0] < 0][:k]
+    return pos, neg
+
+def stats():
+    with _lock:
+        return dict(_stats, cached=len(_cache))
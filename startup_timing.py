@@ -0,0 +1,128 @@
+# startup_timing.py — холодный старт приложений: что импортируется, сколько стоит, когда первый кадр
+# Тяжёлые зависимости (altair, feedparser, deep_translator, VADER, sklearn, joblib) грузятся через
+# lazy_import при первом запуске своей стадии — время каждого первого импорта копится здесь.
+# Замер в чистом процессе (Streamlit AppTest, без браузера) с проверкой бюджета:
+#   python startup_timing.py [crypto_bot_web.py] [--budget 3.0] [--json]
+
+import os, sys, time, json, importlib, threading, subprocess, argparse
+
+def _process_age():
+    """Сек с запуска процесса (Linux: /proc, точность ~10 мс); где нельзя узнать — 0."""
+    try:
+        with open("/proc/self/stat") as f: start = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f: up = float(f.read().split()[0])
+        return max(0.0, up - start/os.sysconf("SC_CLK_TCK"))
+    except Exception:
+        return 0.0
+
+# T0 — старт процесса, а не импорт модуля: в «первый кадр» входят интерпретатор, сервер Streamlit
+# и импорты верхнего уровня до startup_timing. Без /proc T0 = импорт модуля (метка «startup_timing» = 0).
+_AGE = _process_age()
+T0 = time.perf_counter() - _AGE
+BUDGET = float(os.environ.get("CRYPTO_BOT_COLDSTART_BUDGET", "3.0"))   # сек до первого кадра
+HEAVY = ("altair", "feedparser", "deep_translator", "vaderSentiment", "sklearn", "joblib")
+
+_lock = threading.Lock()
+_imports = {}    # модуль -> мс первого импорта через lazy_import
+_marks = {"startup_timing": round(_AGE*1000, 1)}   # метка -> мс от T0 (только первое срабатывание)
+
+def lazy_import(name):
+    """importlib.import_module с замером первого импорта; повторные — из sys.modules без затрат."""
+    mod = sys.modules.get(name)
+    if mod is not None: return mod
+    t = time.perf_counter()
+    mod = importlib.import_module(name)
+    with _lock: _imports.setdefault(name, round((time.perf_counter()-t)*1000, 1))
+    return mod
+
+def mark(label):
+    """Отметить момент (мс от T0); на перезапусках скрипта Streamlit метка не переписывается."""
+    with _lock: _marks.setdefault(label, round((time.perf_counter()-T0)*1000, 1))
+
+def heavy_loaded():
+    return [m for m in HEAVY if m in sys.modules]
+
+# фазы холодного старта: (название, метка начала, метка конца); None — старт процесса
+PHASES = (("процесс → импорт приложения (интерпретатор, сервер Streamlit)", None, "startup_timing"),
+          ("импорты верхнего уровня", "startup_timing", "eager_imports"),
+          ("импорты → первый кадр", "eager_imports", "first_render"))
+
+def phases(marks):
+    out = {}
+    for name, a, b in PHASES:
+        if (a is None or a in marks) and b in marks: out[name] = round(marks[b] - (marks[a] if a else 0.0), 1)
+    return out
+
+def report():
+    with _lock:
+        marks, imports = dict(_marks), dict(_imports)
+    first = marks.get("first_render")
+    return {"marks": marks, "phases": phases(marks), "lazy_imports": imports, "heavy_loaded": heavy_loaded(),
+            "budget_ms": BUDGET*1000, "over_budget": first is not None and first > BUDGET*1000}
+
+def format_report(r):
+    lines = [f"{k}: {v:.0f} мс" for k, v in r["marks"].items()]
+    lines += [f"  {k}: {v:.0f} мс" for k, v in r.get("phases", {}).items()]
+    lines += [f"import {k}: {v:.0f} мс (при первом прогоне, без lazy_import)" for k, v in r.get("eager_imports", {}).items()]
+    lines += [f"import {k}: {v:.0f} мс" for k, v in r["lazy_imports"].items()]
+    lines.append(f"загружены тяжёлые: {', '.join(r['heavy_loaded']) or '—'}")
+    lines.append(f"бюджет до первого кадра: {r['budget_ms']:.0f} мс" + (" — ПРЕВЫШЕН" if r["over_budget"] else ""))
+    return "\n".join(lines)
+
+# ========= Замер в чистом процессе =========
+_PROBE = """
+import sys, json, time
+t = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+base = round((time.perf_counter()-t)*1000, 1)
+at = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2])); at.run()
+import startup_timing as s
+r = s.report(); r["streamlit_import_ms"] = base; r["exceptions"] = [str(e.value) for e in at.exception]
+print(json.dumps(r, ensure_ascii=False))
+"""
+
+EAGER_TOP = 12   # сколько самых дорогих импортов верхнего уровня показывать
+
+def _eager_imports(stderr, lazy, top=EAGER_TOP):
+    """
+    Разбор `python -X importtime`: модули первого уровня, импортированные после AppTest (то есть
+    приложением), кроме lazy_import → {модуль: мс с вложенными}, самые дорогие первыми.
+    """
+    out, started = {}, False
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line: continue
+        _, cum, name = line.split("|", 2)
+        if not cum.strip().isdigit() or name[1:2] == " ": continue   # заголовок / вложенный импорт
+        name = name.strip()
+        if not started: started = name == "streamlit.testing.v1"; continue
+        if name.split(".")[0] not in lazy: out[name] = round(int(cum)/1000, 1)
+    return dict(sorted(out.items(), key=lambda kv: -kv[1])[:top])
+
+def measure(script, timeout=60):
+    here = os.path.dirname(os.path.abspath(__file__))
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c", _PROBE, os.path.join(here, script), str(timeout)],
+                       cwd=here, capture_output=True, text=True, timeout=timeout+30)
+    err = "\n".join(l for l in p.stderr.splitlines() if not l.startswith("import time:")).strip()
+    if p.returncode != 0: raise RuntimeError(err.splitlines()[-1] if err else "probe failed")
+    r = json.loads(p.stdout.strip().splitlines()[-1])
+    r["eager_imports"] = _eager_imports(p.stderr, {m.split(".")[0] for m in r["lazy_imports"]})
+    return r
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Холодный старт Streamlit-приложения: разбивка импортов и время до первого кадра.")
+    ap.add_argument("script", nargs="?", default="crypto_bot_web.py")
+    ap.add_argument("--budget", type=float, default=BUDGET, help="сек до первого кадра")
+    ap.add_argument("--json", action="store_true")
+    a = ap.parse_args(argv)
+    r = measure(a.script)
+    first = r["marks"].get("first_render")
+    r["budget_ms"] = a.budget*1000; r["over_budget"] = first is None or first > a.budget*1000
+    if a.json: print(json.dumps(r, ensure_ascii=False))
+    else:
+        print(f"import streamlit: {r['streamlit_import_ms']:.0f} мс")
+        print(format_report(r))
+        for e in r["exceptions"]: print("ошибка:", e)
+    sys.exit(1 if r["over_budget"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# translation.py — перевод заголовков с кэшем по хэшу текста
+# Ключ — sha1(язык + текст): одни и те же заголовки Cointelegraph/CoinDesk переводятся один раз
+# на процесс (и переживают рестарт — кэш на диске). Промахи уходят пачками:
+# тексты склеиваются через перевод строки до ~4.5k символов, пачки переводятся параллельно.
+
+import time, hashlib, threading, atexit, importlib.util
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import disk_store, perf_trace
+from startup_timing import lazy_import
+
+CACHE_FILE = "translations.json"
+MAX_ITEMS = 5000       # LRU-граница кэша
+SAVE_EVERY = 10.0
+BATCH_CHARS = 4500     # лимит Google Translate ~5000 символов на запрос
+WORKERS = 3            # одновременных пачек
+TARGET = "ru"
+
+_lock = threading.Lock()
+_cache = None          # OrderedDict key -> перевод (порядок = давность использования)
+_stats = {"hit": 0, "miss": 0, "batches": 0}
+_saved_at = 0.0
+_dirty = False
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="translate")
+_translator = None
+
+def get_translator():
+    """GoogleTranslator(auto → TARGET), создаётся при первом обращении; None, если deep_translator недоступен."""
+    global _translator
+    if _translator is None:
+        try:
+            _translator = lazy_import("deep_translator").GoogleTranslator(source="auto", target=TARGET)
+        except Exception:
+            _translator = False
+    return _translator or None
+
+def available():
+    """Есть ли deep_translator — без импорта (для статуса в UI до первого перевода)."""
+    return importlib.util.find_spec("deep_translator") is not None
+
+def _key(target, text):
+    return hashlib.sha1(f"{target}\x00{text}".encode("utf-8")).hexdigest()
+
+def _load():
+    global _cache
+    if _cache is None:
+        _cache = OrderedDict(disk_store.load_json(CACHE_FILE, {}) or {})
+    return _cache
+
+def _save(force=False):
+    # вызывать под _lock
+    global _saved_at, _dirty
+    _dirty = True
+    if _cache is None or (not force and time.time() - _saved_at < SAVE_EVERY):
+        return
+    if disk_store.save_json(CACHE_FILE, _cache):
+        _saved_at, _dirty = time.time(), False
+
+@atexit.register
+def _flush():
+    with _lock:
+        if _dirty: _save(force=True)
+
+def _batches(texts):
+    # индексы промахов, сгруппированные в пачки не длиннее BATCH_CHARS
+    out, cur, size = [], [], 0
+    for i, t in enumerate(texts):
+        if cur and size + len(t) + 1 > BATCH_CHARS:
+            out.append(cur); cur, size = [], 0
+        cur.append(i); size += len(t) + 1
+    if cur: out.append(cur)
+    return out
+
+def _translate_batch(translator, texts):
+    # у deep_translator состояние запроса хранится в объекте — каждой пачке свой экземпляр
+    tr = type(translator)(source=translator.source, target=translator.target)
+    res = None
+    with perf_trace.span("translate_batch", items=len(texts)) as sp:
+        try:
+            joined = tr.translate("\n".join(texts))
+            parts = [p.strip() for p in (joined or "").split("\n")]
+            if len(parts) == len(texts): res = parts
+        except Exception:
+            pass
+        if res is None:  # переводчик склеил/порвал строки — добиваем поштучно
+            sp["per_item"] = True; res = []
+            for t in texts:
+                try: res.append(tr.translate(t))
+                except Exception: res.append(None)
+    return res
+
+def translate_many(texts, translator):
+    """
+    Переводит список строк. Возвращает список той же длины; None — перевод не удался
+    (вызывающий оставляет оригинал). Переводы из кэша не ходят в сеть.
+    """
+    target = getattr(translator, "target", "")
+    texts = [" ".join((t or "").split()) for t in texts]  # переводы строк заняты под разделитель
+    keys = [_key(target, t) for t in texts]
+    out = [None]*len(texts)
+    miss_idx = []
+    with _lock:
+        c = _load()
+        for i, k in enumerate(keys):
+            if k in c:
+                out[i] = c[k]; c.move_to_end(k); _stats["hit"] += 1
+            elif texts[i]:
+                miss_idx.append(i)
+    # одинаковые тексты в одном запросе переводим один раз
+    uniq = list(dict.fromkeys(texts[i] for i in miss_idx))
+    if uniq:
+        groups = _batches(uniq)
+        done = {}
+        futs = [_pool.submit(perf_trace.bind(_translate_batch), translator, [uniq[i] for i in g]) for g in groups]
+        for g, res in zip(groups, (f.result() for f in futs)):
+            for i, r in zip(g, res):
+                if r: done[uniq[i]] = r
+        with _lock:
+            c = _load(); _stats["miss"] += len(uniq); _stats["batches"] += len(groups)
+            for t, r in done.items(): c[_key(target, t)] = r
+            while len(c) > MAX_ITEMS: c.popitem(last=False)
+            _save()
+        for i in miss_idx:
+            out[i] = done.get(texts[i])
+    perf_trace.cache_event("translate", True, len(texts) - len(miss_idx))
+    perf_trace.cache_event("translate", False, len(uniq))
+    return out
+
+def stats():
+    with _lock:
+        return dict(_stats, cached=len(_load()))